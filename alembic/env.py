@@ -24,6 +24,18 @@ if config.config_file_name is not None:
 
 target_metadata = Base.metadata
 
+# Full-text search objects are managed by hand in their migration and are
+# not mapped, so autogenerate must not try to drop them
+UNMAPPED_SEARCH_OBJECTS = {"search_vector", "ix_posts_search_vector"}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    if name in UNMAPPED_SEARCH_OBJECTS:
+        return False
+    if type_ == "table" and name and name.startswith("posts_fts"):
+        return False
+    return True
+
 
 def run_migrations_offline() -> None:
     url = config.get_main_option("sqlalchemy.url")
@@ -32,6 +44,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
         # Required for SQLite to allow table modifications
         render_as_batch=True,
     )
@@ -55,6 +68,7 @@ def run_migrations_online() -> None:
         context.configure(
             connection=connection,
             target_metadata=target_metadata,
+            include_object=include_object,
             # Essential for SQLite compatibility
             render_as_batch=True,
             # Optional: Ensures constraint names are handled properly
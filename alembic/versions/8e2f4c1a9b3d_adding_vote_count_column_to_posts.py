@@ -0,0 +1,43 @@
+"""adding vote_count column to posts table
+
+Revision ID: 8e2f4c1a9b3d
+Revises: 5b77a6f424e9
+Create Date: 2026-10-18 12:05:41.318204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8e2f4c1a9b3d"
+down_revision: Union[str, Sequence[str], None] = "5b77a6f424e9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("posts", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column("vote_count", sa.Integer(), server_default="0", nullable=False)
+        )
+        batch_op.create_index(
+            "ix_posts_vote_count_id", ["vote_count", "id"], unique=False
+        )
+
+    # Backfill the counter from the existing votes
+    op.execute(
+        "UPDATE posts SET vote_count = "
+        "(SELECT COUNT(*) FROM votes WHERE votes.post_id = posts.id)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("posts", schema=None) as batch_op:
+        batch_op.drop_index("ix_posts_vote_count_id")
+        batch_op.drop_column("vote_count")
@@ -0,0 +1,69 @@
+"""adding follows and timeline_entries tables
+
+Revision ID: a7c3e9f1b254
+Revises: f2a6d4b8e013
+Create Date: 2026-10-18 16:12:38.640215
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a7c3e9f1b254"
+down_revision: Union[str, Sequence[str], None] = "f2a6d4b8e013"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("users", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "follower_count", sa.Integer(), server_default="0", nullable=False
+            )
+        )
+
+    op.create_table(
+        "follows",
+        sa.Column("follower_id", sa.Integer(), nullable=False),
+        sa.Column("followed_id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["follower_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["followed_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("follower_id", "followed_id"),
+    )
+    op.create_index("ix_follows_followed_id", "follows", ["followed_id"], unique=False)
+
+    op.create_table(
+        "timeline_entries",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("post_id", sa.Integer(), nullable=False),
+        sa.Column("post_created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["post_id"], ["posts.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id", "post_id"),
+    )
+    op.create_index(
+        "ix_timeline_entries_user_id_post_created_at_post_id",
+        "timeline_entries",
+        ["user_id", "post_created_at", "post_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_timeline_entries_user_id_post_created_at_post_id",
+        table_name="timeline_entries",
+    )
+    op.drop_table("timeline_entries")
+    op.drop_index("ix_follows_followed_id", table_name="follows")
+    op.drop_table("follows")
+    with op.batch_alter_table("users", schema=None) as batch_op:
+        batch_op.drop_column("follower_count")
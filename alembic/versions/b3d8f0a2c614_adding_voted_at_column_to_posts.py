@@ -0,0 +1,33 @@
+"""adding voted_at column to posts table
+
+Revision ID: b3d8f0a2c614
+Revises: a7c3e9f1b254
+Create Date: 2026-10-18 18:22:37.540913
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b3d8f0a2c614"
+down_revision: Union[str, Sequence[str], None] = "a7c3e9f1b254"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("posts", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column("voted_at", sa.DateTime(timezone=True), nullable=True)
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("posts", schema=None) as batch_op:
+        batch_op.drop_column("voted_at")
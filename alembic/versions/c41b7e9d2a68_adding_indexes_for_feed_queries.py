@@ -0,0 +1,39 @@
+"""adding indexes for feed queries
+
+Revision ID: c41b7e9d2a68
+Revises: 3a7d9c2e5f10
+Create Date: 2026-10-18 13:02:18.904716
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c41b7e9d2a68"
+down_revision: Union[str, Sequence[str], None] = "3a7d9c2e5f10"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_posts_created_at_id", "posts", ["created_at", "id"], unique=False
+    )
+    op.create_index(
+        "ix_posts_owner_id_created_at_id",
+        "posts",
+        ["owner_id", "created_at", "id"],
+        unique=False,
+    )
+    op.create_index("ix_votes_post_id", "votes", ["post_id"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_votes_post_id", table_name="votes")
+    op.drop_index("ix_posts_owner_id_created_at_id", table_name="posts")
+    op.drop_index("ix_posts_created_at_id", table_name="posts")
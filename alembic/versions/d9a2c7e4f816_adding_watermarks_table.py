@@ -0,0 +1,36 @@
+"""adding watermarks table and posts.voted_at index
+
+Revision ID: d9a2c7e4f816
+Revises: b3d8f0a2c614
+Create Date: 2026-10-18 20:41:09.318274
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d9a2c7e4f816"
+down_revision: Union[str, Sequence[str], None] = "b3d8f0a2c614"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "watermarks",
+        sa.Column("name", sa.String(length=64), nullable=False),
+        sa.Column("value", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("name"),
+    )
+    op.create_index("ix_posts_voted_at", "posts", ["voted_at"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_posts_voted_at", table_name="posts")
+    op.drop_table("watermarks")
@@ -0,0 +1,79 @@
+"""adding hot_score column to posts table
+
+Revision ID: f2a6d4b8e013
+Revises: e5b8a1f3c729
+Create Date: 2026-10-18 15:04:52.117630
+
+"""
+
+import math
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f2a6d4b8e013"
+down_revision: Union[str, Sequence[str], None] = "e5b8a1f3c729"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+# Frozen copy of app.models.models.hot_score with its defaults at this
+# revision, so later formula or HOT_DECAY_SECONDS changes don't alter it
+HOT_EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+HOT_DECAY_SECONDS = 45000.0
+
+
+def hot_score(vote_count: int, created_at: datetime) -> float:
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    age = (created_at - HOT_EPOCH).total_seconds()
+    return math.log10(max(vote_count, 1)) + age / HOT_DECAY_SECONDS
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("posts", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column("hot_score", sa.Float(), server_default="0", nullable=False)
+        )
+        batch_op.create_index(
+            "ix_posts_hot_score_id", ["hot_score", "id"], unique=False
+        )
+
+    # Backfill with the formula the app used for new posts and votes
+    posts = sa.table(
+        "posts",
+        sa.column("id", sa.Integer),
+        sa.column("vote_count", sa.Integer),
+        sa.column("created_at", sa.DateTime(timezone=True)),
+        sa.column("hot_score", sa.Float),
+    )
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(posts.c.id, posts.c.vote_count, posts.c.created_at)
+    ).all()
+    update_score = (
+        sa.update(posts)
+        .where(posts.c.id == sa.bindparam("post_id"))
+        .values(hot_score=sa.bindparam("score"))
+    )
+    for start in range(0, len(rows), BACKFILL_BATCH_SIZE):
+        bind.execute(
+            update_score,
+            [
+                {"post_id": row.id, "score": hot_score(row.vote_count, row.created_at)}
+                for row in rows[start : start + BACKFILL_BATCH_SIZE]
+            ],
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("posts", schema=None) as batch_op:
+        batch_op.drop_index("ix_posts_hot_score_id")
+        batch_op.drop_column("hot_score")
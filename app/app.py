@@ -1,15 +1,55 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.responses import RedirectResponse
 from fastapi.middleware.cors import CORSMiddleware
+from app.auth import oauth2
+from app.config.config import settings
+from app.database import database
+from app.metrics import metrics
+from app.ranking import ranking
 from app.routers import auth, post, user, vote
+from app.routers import metrics as metrics_router
+from app.vote_buffer import vote_buffer
 # from app.models import models
 # from app.database.database import engine
 
 # models.Base.metadata.create_all(bind=engine)
-app = FastAPI()
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    tasks = []
+    if settings.vote_write_behind:
+        # Votes acknowledged before a crash are still in the log
+        vote_buffer.vote_buffer.load()
+        tasks.append(asyncio.create_task(vote_buffer.run_vote_flusher()))
+    # Votes its final refresh misses stay past the stored watermark, so the
+    # next start ranks them
+    tasks.append(asyncio.create_task(ranking.run_hot_score_refresher()))
+    yield
+    for task in tasks:
+        task.cancel()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    for task, result in zip(tasks, results):
+        if isinstance(result, Exception):
+            logger.error(
+                "Background task %s failed during shutdown",
+                task.get_coro().__qualname__,
+                exc_info=result,
+            )
+
+
+app = FastAPI(lifespan=lifespan)
 
 
 origins = ["*", "http://localhost:3000"]
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
 
 app.add_middleware(
     CORSMiddleware,
@@ -17,12 +57,65 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[post.NEXT_CURSOR_HEADER, "Server-Timing", "ETag"],
 )
 
+
+@app.middleware("http")
+async def instrument_request(request: Request, call_next):
+    """
+    Collect per-request statement count and DB time for Server-Timing,
+    and request count and latency for /metrics.
+    """
+    stats = database.new_query_stats(request.scope)
+    token = database.query_stats.set(stats)
+    start = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+    finally:
+        database.query_stats.reset(token)
+        # Route templates keep label cardinality bounded
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        metrics.record_request(
+            request.method, route, status_code, time.perf_counter() - start
+        )
+
+    if settings.database_server_timing:
+        response.headers["Server-Timing"] = database.server_timing(stats)
+    return response
+
+
+@app.middleware("http")
+async def route_reads(request: Request, call_next):
+    """
+    Keep a user's reads on the primary for a short window after they write,
+    so replica lag never hides their own changes.
+    """
+    if not database.replicas.engines:
+        return await call_next(request)
+
+    user_id = oauth2.get_token_user_id(request.headers.get("authorization"))
+    token = database.read_from_primary.set(
+        user_id is not None and database.wrote_recently(user_id)
+    )
+    try:
+        response = await call_next(request)
+    finally:
+        database.read_from_primary.reset(token)
+
+    if user_id is not None and request.method not in SAFE_METHODS:
+        if response.status_code < 400:
+            database.mark_recent_write(user_id)
+    return response
+
+
 app.include_router(post.router)
 app.include_router(user.router)
 app.include_router(auth.router)
 app.include_router(vote.router)
+app.include_router(metrics_router.router)
 
 
 @app.get("/")
@@ -1,14 +1,19 @@
+import hashlib
+import time
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from datetime import datetime, timedelta, timezone
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import make_transient_to_detached
 
+from app.cache.cache import TTLCache
 from app.config.config import settings
 from app.models.models import User
-from app.database.database import get_async_db
-from app.schemas.schemas import TokenData
+from app.database.database import get_async_db, get_read_db
+from app.schemas.schemas import Principal, TokenData
 
 # -------------------- CONFIG --------------------
 SECRET_KEY: str = settings.secret_key
@@ -17,6 +22,31 @@ ACCESS_TOKEN_EXPIRE_MINUTES: int = settings.access_token_expire_minutes
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
+# Column values of authenticated users keyed by email, so hot users skip the
+# lookup query; never the instances, which belong to the session that loaded them
+user_cache = TTLCache(
+    maxsize=settings.user_cache_size, ttl=settings.user_cache_ttl_seconds
+)
+
+
+# Current token version per user id, so revocation checks skip the database
+token_version_cache = TTLCache(
+    maxsize=settings.user_cache_size, ttl=settings.user_cache_ttl_seconds
+)
+
+
+# Decoded tokens keyed by their SHA-256, each kept until the token's exp
+token_cache = TTLCache(maxsize=settings.token_cache_size, ttl=0)
+
+
+def invalidate_cached_user(email: str, user_id: int | None = None):
+    """
+    Drop a user from the auth caches after it was changed or deleted.
+    """
+    user_cache.invalidate(email)
+    if user_id is not None:
+        token_version_cache.invalidate(user_id)
+
 
 # -------------------- TOKEN CREATION --------------------
 def create_access_token(data: dict) -> str:
@@ -32,17 +62,72 @@ def create_access_token(data: dict) -> str:
 # -------------------- TOKEN VERIFICATION --------------------
 def verify_access_token(token: str, credentials_exception: HTTPException) -> TokenData:
     """
-    Decode and validate JWT token.
+    Decode and validate JWT token, reusing earlier decodes of the same token.
     """
+    token_key = hashlib.sha256(token.encode()).digest()
+    token_data: TokenData | None = token_cache.get(token_key)
+    if token_data is not None:
+        return token_data
+
     try:
         payload = jwt.decode(token=token, key=SECRET_KEY, algorithms=[ALGORITHM])
         email: str | None = payload.get("user_email")
         if not email:
             raise credentials_exception
-        return TokenData(email=email)
-    except JWTError:
+        # Tokens issued before ids were embedded carry the email only
+        sub: str | None = payload.get("sub")
+        token_data = TokenData(
+            email=email,
+            id=int(sub) if sub is not None else None,
+            version=payload.get("ver"),
+        )
+    except (JWTError, ValueError):
         raise credentials_exception
 
+    # jose already rejected expired tokens, so exp is in the future here
+    exp = payload.get("exp")
+    if exp is not None:
+        token_cache.set(token_key, token_data, ttl=exp - time.time())
+    return token_data
+
+
+def get_token_user_id(authorization: str | None) -> int | None:
+    """
+    User id from a bearer Authorization header, or None if there is no valid
+    token with an embedded id.
+    """
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return verify_access_token(token, get_credentials_exception()).id
+    except HTTPException:
+        return None
+
+
+async def get_token_version(db: AsyncSession, user_id: int) -> int | None:
+    """
+    Return the user's current token version, or None if the user is gone.
+    """
+    version: int | None = token_version_cache.get(user_id)
+    if version is not None:
+        return version
+
+    stmt = select(User.token_version).where(User.id == user_id)
+    result = await db.execute(stmt)
+    version = result.scalar_one_or_none()
+    if version is not None:
+        token_version_cache.set(user_id, version)
+    return version
+
+
+def get_credentials_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
 
 # -------------------- GET CURRENT USER --------------------
 async def get_current_user(
@@ -52,18 +137,62 @@ async def get_current_user(
     """
     Dependency to get the currently authenticated user asynchronously.
     """
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Invalid credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-
+    credentials_exception = get_credentials_exception()
     token_data = verify_access_token(token, credentials_exception)
+    user = await load_user(db, token_data.email)
+
+    if not user:
+        raise credentials_exception
+    if token_data.version is not None and token_data.version != user.token_version:
+        raise credentials_exception
+    return user
+
+
+def snapshot_user(user: User) -> dict:
+    return {attr.key: getattr(user, attr.key) for attr in User.__mapper__.column_attrs}
+
+
+def detached_user(values: dict) -> User:
+    user = User(**values)
+    make_transient_to_detached(user)
+    return user
 
-    stmt = select(User).where(User.email == token_data.email)
+
+async def load_user(db: AsyncSession, email: str) -> User | None:
+    cached_values: dict | None = user_cache.get(email)
+    if cached_values is not None:
+        # Attach a fresh copy to this session without a SELECT, so
+        # relationships such as Post.owner still resolve from the identity map
+        return await db.merge(detached_user(cached_values), load=False)
+
+    stmt = select(User).where(User.email == email)
     result = await db.execute(stmt)
     user: User | None = result.scalar_one_or_none()
 
-    if not user:
-        raise credentials_exception
+    if user:
+        user_cache.set(email, snapshot_user(user))
+        token_version_cache.set(user.id, user.token_version)
     return user
+
+
+# -------------------- GET CURRENT PRINCIPAL --------------------
+async def get_current_principal(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_read_db),
+) -> Principal:
+    """
+    Lightweight dependency for read-only routes: trusts the id in the token
+    and only checks it against the cached token version.
+    """
+    credentials_exception = get_credentials_exception()
+    token_data = verify_access_token(token, credentials_exception)
+
+    if token_data.id is None:
+        user = await load_user(db, token_data.email)
+        if not user:
+            raise credentials_exception
+        return Principal(id=user.id, email=user.email)
+
+    if await get_token_version(db, token_data.id) != token_data.version:
+        raise credentials_exception
+    return Principal(id=token_data.id, email=token_data.email)
@@ -0,0 +1,269 @@
+import asyncio
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable
+
+from app.config.config import settings
+
+
+class TTLCache:
+    """
+    Bounded in-process LRU cache whose entries expire after a fixed TTL.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None):
+        if self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+# -------------------- SHARED BACKENDS --------------------
+
+
+class CacheBackend(ABC):
+    """
+    Async key/value store behind caches that may be shared between workers.
+    Values must be JSON serializable.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Any: ...
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: float): ...
+
+    @abstractmethod
+    async def get_counter(self, key: str) -> int: ...
+
+    @abstractmethod
+    async def incr(self, key: str) -> int: ...
+
+    def stats(self) -> dict:
+        return {}
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    Per-process backend; invalidations are not seen by other workers.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._counters: dict[str, int] = {}
+
+    async def get(self, key: str) -> Any:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: Any, ttl: float):
+        self._cache.set(key, value, ttl)
+
+    async def get_counter(self, key: str) -> int:
+        return self._counters.get(key, 0)
+
+    async def incr(self, key: str) -> int:
+        self._counters[key] = self._counters.get(key, 0) + 1
+        return self._counters[key]
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Backend for any Redis-compatible server, shared by all workers.
+    Needs the optional `redis` package.
+    """
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(url)
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> Any:
+        raw = await self._redis.get(key)
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(raw)
+
+    async def set(self, key: str, value: Any, ttl: float):
+        await self._redis.set(key, json.dumps(value), ex=max(int(ttl), 1))
+
+    async def get_counter(self, key: str) -> int:
+        return int(await self._redis.get(key) or 0)
+
+    async def incr(self, key: str) -> int:
+        return await self._redis.incr(key)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+def create_cache_backend(backend: str, maxsize: int, ttl: float, url: str):
+    if backend == "redis":
+        return RedisCacheBackend(url)
+    return MemoryCacheBackend(maxsize=maxsize, ttl=ttl)
+
+
+# -------------------- SINGLE FLIGHT --------------------
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls: while a call for a key is running, later
+    callers with the same key await it and share its result.
+    """
+
+    def __init__(self):
+        self._calls: dict[Hashable, asyncio.Future] = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        while (future := self._calls.get(key)) is not None:
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # The running call was cancelled with its request, not ours;
+                # loop around and run it ourselves
+                if not future.cancelled() or asyncio.current_task().cancelling():
+                    raise
+                self.coalesced -= 1
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        self.executions += 1
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # Mark it retrieved, waiters (if any) get it re-raised
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    def stats(self) -> dict:
+        calls = self.executions + self.coalesced
+        return {
+            "in_flight": len(self._calls),
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "dedup_rate": self.coalesced / calls if calls else 0.0,
+        }
+
+
+# -------------------- FEED CACHE --------------------
+
+
+class FeedCache:
+    """
+    Cache for user-independent feed pages.
+
+    Keys embed a generation counter, so invalidating every page is a single
+    increment instead of a scan over keys.
+    """
+
+    GENERATION_KEY = "feed:generation"
+
+    def __init__(self, backend: CacheBackend, ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+
+    async def generation(self) -> int:
+        return await self.backend.get_counter(self.GENERATION_KEY)
+
+    def key(self, generation: int, params: list) -> str:
+        return f"feed:{generation}:{json.dumps(params, default=str)}"
+
+    async def get(self, generation: int, params: list) -> Any:
+        return await self.backend.get(self.key(generation, params))
+
+    async def set(self, generation: int, params: list, value: Any):
+        await self.backend.set(self.key(generation, params), value, self.ttl)
+
+    async def invalidate(self):
+        await self.backend.incr(self.GENERATION_KEY)
+
+    def stats(self) -> dict:
+        return self.backend.stats()
+
+
+feed_cache = FeedCache(
+    create_cache_backend(
+        settings.feed_cache_backend,
+        maxsize=settings.feed_cache_size,
+        ttl=settings.feed_cache_ttl_seconds,
+        url=settings.feed_cache_url,
+    ),
+    ttl=settings.feed_cache_ttl_seconds,
+)
+
+# Shared by concurrent requests for the same public feed page
+feed_flight = SingleFlight()
@@ -11,6 +11,48 @@ class AppSettings(BaseSettings):
     secret_key: str = "supersecret"
     access_token_expire_minutes: int = 60
     database_com: str = "default"
+    database_echo: bool = False
+    database_pool_size: int = 5
+    database_max_overflow: int = 10
+    database_pool_timeout: float = 30.0
+    database_pool_recycle: int = 1800
+    database_pool_pre_ping: bool = True
+    database_pool_slow_checkout_ms: float = 100.0
+    database_slow_query_ms: float = 200.0
+    database_server_timing: bool = True
+    database_statement_cache_size: int = 100
+    database_server_settings: dict[str, str] = {}
+    database_replica_urls: list[str] = []
+    database_replica_retry_seconds: float = 10.0
+    database_read_your_writes_seconds: float = 5.0
+    user_cache_size: int = 1024
+    user_cache_ttl_seconds: int = 60
+    token_cache_size: int = 4096
+    password_hash_concurrency: int = 2
+    search_backend: str = "fulltext"  # "fulltext" or "ilike"
+    vote_batch_max_size: int = 500
+    vote_write_behind: bool = False
+    vote_buffer_durability: str = "log"  # "memory", "log" or "fsync"
+    vote_buffer_log_path: str = "vote_buffer.log"
+    vote_buffer_max_pending: int = 10000
+    vote_flush_interval_seconds: float = 1.0
+    vote_flush_batch_size: int = 1000
+    # Off by default: the memory backend is per worker, so other workers can
+    # serve pages up to feed_cache_ttl_seconds old; use redis with several
+    feed_cache_enabled: bool = False
+    feed_cache_backend: str = "memory"  # "memory" or "redis"
+    feed_cache_url: str = "redis://localhost:6379/0"
+    feed_cache_size: int = 256
+    feed_cache_ttl_seconds: int = 30
+    feed_single_flight: bool = True
+    fast_serialization: bool = False
+    hot_decay_seconds: float = 45000.0
+    hot_refresh_interval_seconds: float = 5.0
+    hot_refresh_overlap_seconds: float = 30.0
+    timeline_fanout_max_followers: int = 10000
+    timeline_backfill_size: int = 100
+    export_batch_size: int = 1000
+    users_page_max_size: int = 500
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -1,8 +1,22 @@
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+import logging
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import (
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import DeclarativeBase
 
+from ..cache.cache import TTLCache
 from ..config.config import settings
 
+logger = logging.getLogger(__name__)
+
 # Async SQLAlchemy URL for PostgreSQL
 
 
@@ -11,12 +25,102 @@ if settings.database_com != "sqlite":
         f"postgresql+asyncpg://{settings.database_username}:"
         f"{settings.database_password}@{settings.database_host}:"
         f"{settings.database_port}/{settings.database_name}"
+        f"?prepared_statement_cache_size={settings.database_statement_cache_size}"
     )
+    connect_args = {"server_settings": settings.database_server_settings}
 else:
     DATABASE_URL = "sqlite+aiosqlite:///./sql_app.db"
+    connect_args = {}
+
+# Pool sizes are per process (and per engine), so size them per uvicorn worker
+ENGINE_OPTIONS = {
+    "echo": settings.database_echo,
+    "future": True,
+    "pool_size": settings.database_pool_size,
+    "max_overflow": settings.database_max_overflow,
+    "pool_timeout": settings.database_pool_timeout,
+    "pool_recycle": settings.database_pool_recycle,
+    "pool_pre_ping": settings.database_pool_pre_ping,
+    "connect_args": connect_args,
+}
 
 # Create async engine
-engine = create_async_engine(DATABASE_URL, echo=True, future=True)
+engine = create_async_engine(DATABASE_URL, **ENGINE_OPTIONS)
+
+if settings.database_com == "sqlite":
+    # SQLite ignores foreign keys unless asked; the vote path relies on them
+    @event.listens_for(engine.sync_engine, "connect")
+    def enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+
+def dialect_insert(table):
+    """
+    INSERT for the configured database, with its ON CONFLICT clauses.
+    """
+    if settings.database_com == "sqlite":
+        return sqlite.insert(table)
+    return postgresql.insert(table)
+
+
+# Statement stats of the current request; set by the middleware in app.app
+query_stats: ContextVar[dict | None] = ContextVar("query_stats", default=None)
+
+
+def describe_route(scope: dict | None) -> str:
+    if not scope:
+        return "no request"
+    route = scope.get("route")
+    path = getattr(route, "path", None) or scope.get("path", "")
+    return f"{scope.get('method', '')} {path}"
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    context._query_start_time = time.perf_counter()
+
+
+@event.listens_for(engine.sync_engine, "after_cursor_execute")
+def record_query_time(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._query_start_time
+    stats = query_stats.get()
+    if stats is not None:
+        stats["count"] += 1
+        stats["total"] += elapsed
+        if elapsed > stats["slowest"]:
+            stats["slowest"] = elapsed
+            stats["slowest_statement"] = statement
+
+    if elapsed * 1000 >= settings.database_slow_query_ms:
+        logger.warning(
+            "Slow query (%.1f ms) on %s: %s",
+            elapsed * 1000,
+            describe_route(stats and stats["scope"]),
+            statement,
+        )
+
+
+def new_query_stats(scope: dict | None = None) -> dict:
+    return {
+        "count": 0,
+        "total": 0.0,
+        "slowest": 0.0,
+        "slowest_statement": None,
+        "scope": scope,
+    }
+
+
+def server_timing(stats: dict) -> str:
+    """
+    Format request query stats as a Server-Timing header value.
+    """
+    return (
+        f'db;dur={stats["total"] * 1000:.2f};desc="{stats["count"]} queries", '
+        f"db-slowest;dur={stats['slowest'] * 1000:.2f}"
+    )
+
 
 # Async session factory
 AsyncSessionLocal = async_sessionmaker(
@@ -24,12 +128,157 @@ AsyncSessionLocal = async_sessionmaker(
 )
 
 
+# -------------------- READ REPLICAS --------------------
+class ReplicaSet:
+    """
+    Round-robin over replica engines, skipping any that failed a connection
+    attempt within the last health check interval.
+    """
+
+    def __init__(self, urls: list[str], retry_after: float):
+        self.urls = urls
+        self.retry_after = retry_after
+        self.engines = [create_async_engine(url, **ENGINE_OPTIONS) for url in urls]
+        self.sessionmakers = [
+            async_sessionmaker(bind=e, expire_on_commit=False, autoflush=False)
+            for e in self.engines
+        ]
+        self.down_until = [0.0] * len(urls)
+        self._next = 0
+
+        for replica in self.engines:
+            event.listen(
+                replica.sync_engine, "before_cursor_execute", start_query_timer
+            )
+            event.listen(replica.sync_engine, "after_cursor_execute", record_query_time)
+
+    def pick(self) -> int | None:
+        now = time.monotonic()
+        for _ in range(len(self.engines)):
+            index = self._next
+            self._next = (self._next + 1) % len(self.engines)
+            if self.down_until[index] <= now:
+                return index
+        return None
+
+    def mark_down(self, index: int):
+        self.down_until[index] = time.monotonic() + self.retry_after
+        logger.warning(
+            "Read replica %d is unreachable, using the primary for %.0f s",
+            index,
+            self.retry_after,
+        )
+
+    def stats(self) -> list[dict]:
+        now = time.monotonic()
+        return [
+            {"replica": index, "healthy": self.down_until[index] <= now}
+            for index in range(len(self.engines))
+        ]
+
+
+replicas = ReplicaSet(
+    settings.database_replica_urls,
+    retry_after=settings.database_replica_retry_seconds,
+)
+
+# Users who wrote recently, so their reads stay on the primary until the
+# replicas have caught up; per process, like the other in-memory caches
+recent_writers = TTLCache(
+    maxsize=settings.user_cache_size, ttl=settings.database_read_your_writes_seconds
+)
+
+# Set by the middleware in app.app when this request must read the primary
+read_from_primary: ContextVar[bool] = ContextVar("read_from_primary", default=False)
+
+
+def mark_recent_write(user_id: int):
+    recent_writers.set(user_id, True)
+
+
+def wrote_recently(user_id: int) -> bool:
+    return recent_writers.get(user_id, False)
+
+
+async def open_read_session() -> AsyncSession:
+    """
+    Open a session on a healthy replica, or on the primary when there are
+    none, none are reachable, or this request must see its own writes.
+    """
+    if not read_from_primary.get():
+        while (index := replicas.pick()) is not None:
+            session = replicas.sessionmakers[index]()
+            try:
+                await session.connection()
+                return session
+            except (DBAPIError, OSError):
+                await session.close()
+                replicas.mark_down(index)
+
+    return AsyncSessionLocal()
+
+
+# Checkout wait times, accumulated since process start
+_checkout_stats = {"count": 0, "total_wait": 0.0, "max_wait": 0.0}
+
+
 # Base class for models
 class Base(DeclarativeBase):
     pass
 
 
+def record_checkout_wait(wait: float):
+    _checkout_stats["count"] += 1
+    _checkout_stats["total_wait"] += wait
+    _checkout_stats["max_wait"] = max(_checkout_stats["max_wait"], wait)
+
+    if wait * 1000 >= settings.database_pool_slow_checkout_ms:
+        logger.warning(
+            "Waited %.1f ms for a database connection (%s)",
+            wait * 1000,
+            engine.pool.status(),
+        )
+
+
+def pool_stats() -> dict:
+    """
+    Snapshot of pool usage and connection checkout wait times.
+    """
+    pool = engine.pool
+    capacity = settings.database_pool_size + settings.database_max_overflow
+    checked_out = pool.checkedout() if hasattr(pool, "checkedout") else 0
+    count = _checkout_stats["count"]
+    return {
+        "size": pool.size() if hasattr(pool, "size") else 0,
+        "checked_out": checked_out,
+        # QueuePool reports a negative overflow while below pool_size
+        "overflow": max(pool.overflow(), 0) if hasattr(pool, "overflow") else 0,
+        "saturation": checked_out / capacity if capacity else 0.0,
+        "checkouts": count,
+        "avg_wait": _checkout_stats["total_wait"] / count if count else 0.0,
+        "max_wait": _checkout_stats["max_wait"],
+    }
+
+
 # Dependency
 async def get_async_db():
     async with AsyncSessionLocal() as session:
+        # Check out the connection up front so pool waits are measured
+        start = time.perf_counter()
+        await session.connection()
+        record_checkout_wait(time.perf_counter() - start)
+        yield session
+
+
+async def get_read_db():
+    """
+    Session for read-only routes, balanced across the read replicas.
+    """
+    start = time.perf_counter()
+    session = await open_read_session()
+    try:
+        await session.connection()
+        record_checkout_wait(time.perf_counter() - start)
         yield session
+    finally:
+        await session.close()
@@ -0,0 +1,201 @@
+from app.auth import oauth2
+from app.cache.cache import feed_cache, feed_flight
+from app.database.database import pool_stats, replicas
+from app.utils.utils import hash_stats
+from app.vote_buffer.vote_buffer import vote_buffer
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Request latency buckets in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram in the Prometheus exposition layout.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def samples(self, name: str, labels: dict) -> list[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(sample(f"{name}_bucket", {**labels, "le": bound}, cumulative))
+        lines.append(sample(f"{name}_bucket", {**labels, "le": "+Inf"}, self.count))
+        lines.append(sample(f"{name}_sum", labels, self.sum))
+        lines.append(sample(f"{name}_count", labels, self.count))
+        return lines
+
+
+# Keyed by (method, route template, status) and (method, route template)
+request_counts: dict[tuple[str, str, str], int] = {}
+request_latency: dict[tuple[str, str], Histogram] = {}
+
+
+def record_request(method: str, route: str, status_code: int, duration: float):
+    key = (method, route, str(status_code))
+    request_counts[key] = request_counts.get(key, 0) + 1
+    histogram = request_latency.get((method, route))
+    if histogram is None:
+        histogram = request_latency[(method, route)] = Histogram()
+    histogram.observe(duration)
+
+
+# -------------------- EXPOSITION --------------------
+
+
+def escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def sample(name: str, labels: dict, value) -> str:
+    if labels:
+        rendered = ",".join(f'{k}="{escape_label(v)}"' for k, v in labels.items())
+        return f"{name}{{{rendered}}} {value}"
+    return f"{name} {value}"
+
+
+def metric(name: str, kind: str, help_text: str, samples: list[str]) -> list[str]:
+    return [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", *samples]
+
+
+def cache_stats() -> dict[str, dict]:
+    return {
+        "user": oauth2.user_cache.stats(),
+        "token_version": oauth2.token_version_cache.stats(),
+        "token": oauth2.token_cache.stats(),
+        "feed": feed_cache.stats(),
+    }
+
+
+def render_metrics() -> str:
+    """
+    Render every metric in the Prometheus text format.
+    """
+    lines = []
+
+    lines += metric(
+        "http_requests_total",
+        "counter",
+        "HTTP requests by route template and status.",
+        [
+            sample("http_requests_total", {"method": m, "route": r, "status": s}, n)
+            for (m, r, s), n in sorted(request_counts.items())
+        ],
+    )
+    lines += metric(
+        "http_request_duration_seconds",
+        "histogram",
+        "HTTP request latency by route template.",
+        [
+            line
+            for (m, r), histogram in sorted(request_latency.items())
+            for line in histogram.samples(
+                "http_request_duration_seconds", {"method": m, "route": r}
+            )
+        ],
+    )
+
+    pool = pool_stats()
+    for key, kind, help_text in (
+        ("size", "gauge", "Connections kept open by the pool."),
+        ("checked_out", "gauge", "Connections currently checked out."),
+        ("overflow", "gauge", "Connections open beyond the pool size."),
+        ("saturation", "gauge", "Checked-out share of pool size plus overflow."),
+        ("checkouts", "counter", "Connection checkouts by request sessions."),
+        ("max_wait", "gauge", "Longest connection checkout wait in seconds."),
+    ):
+        name = f"db_pool_{key}" + ("_total" if kind == "counter" else "")
+        lines += metric(name, kind, help_text, [sample(name, {}, pool[key])])
+    lines += metric(
+        "db_pool_checkout_wait_seconds_avg",
+        "gauge",
+        "Average connection checkout wait in seconds.",
+        [sample("db_pool_checkout_wait_seconds_avg", {}, pool["avg_wait"])],
+    )
+
+    lines += metric(
+        "db_replica_healthy",
+        "gauge",
+        "1 while a read replica is in rotation, 0 after a failed connect.",
+        [
+            sample("db_replica_healthy", {"replica": r["replica"]}, int(r["healthy"]))
+            for r in replicas.stats()
+        ],
+    )
+
+    hashing = hash_stats()
+    for key, help_text in (
+        ("limit", "Argon2 hashes allowed to run at once."),
+        ("active", "Argon2 hashes running now."),
+        ("queued", "Callers waiting for an Argon2 slot."),
+    ):
+        name = f"password_hash_{key}"
+        lines += metric(name, "gauge", help_text, [sample(name, {}, hashing[key])])
+    for name, key, help_text in (
+        ("password_hash_seconds", "hash_time", "Time spent hashing or verifying."),
+        ("password_hash_wait_seconds", "wait_time", "Time waiting for an Argon2 slot."),
+    ):
+        lines += metric(
+            name,
+            "summary",
+            help_text,
+            [
+                sample(f"{name}_sum", {}, hashing[key]),
+                sample(f"{name}_count", {}, hashing["count"]),
+            ],
+        )
+
+    caches = cache_stats()
+    for key, kind, help_text in (
+        ("hits", "counter", "Cache lookups that found a live entry."),
+        ("misses", "counter", "Cache lookups that found nothing."),
+        ("hit_rate", "gauge", "Hits over lookups since process start."),
+        ("size", "gauge", "Entries held by in-process caches."),
+    ):
+        name = f"cache_{key}" + ("_total" if kind == "counter" else "")
+        lines += metric(
+            name,
+            kind,
+            help_text,
+            [
+                sample(name, {"cache": cache}, stats[key])
+                for cache, stats in caches.items()
+                if key in stats
+            ],
+        )
+
+    flight = feed_flight.stats()
+    for key, kind, help_text in (
+        ("executions", "counter", "Feed page queries actually run."),
+        ("coalesced", "counter", "Feed page requests that shared a running query."),
+        ("in_flight", "gauge", "Feed page queries running now."),
+    ):
+        name = f"feed_single_flight_{key}" + ("_total" if kind == "counter" else "")
+        lines += metric(name, kind, help_text, [sample(name, {}, flight[key])])
+
+    buffered = vote_buffer.stats()
+    for key, kind, help_text in (
+        ("pending", "gauge", "Votes acknowledged but not yet flushed."),
+        ("flushing", "gauge", "Votes in the flush running now."),
+        ("flushed", "counter", "Buffered votes written to the database."),
+        ("failures", "counter", "Vote buffer flushes that failed and were retried."),
+    ):
+        name = f"vote_buffer_{key}" + ("_total" if kind == "counter" else "")
+        lines += metric(name, kind, help_text, [sample(name, {}, buffered[key])])
+
+    return "\n".join(lines) + "\n"
@@ -1,21 +1,66 @@
+import math
 from datetime import datetime, timezone
-from sqlalchemy import Boolean, ForeignKey, Integer, String, DateTime
+from sqlalchemy import (
+    Boolean,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    update,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from app.config.config import settings
 from app.database.database import Base
 
+# Reference point for hot scores; only differences between scores matter
+HOT_EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
 
 def utcnow():
     return datetime.now(timezone.utc)
 
 
+def hot_score(vote_count: int, created_at: datetime) -> float:
+    """
+    Rank by log-scaled votes plus age: every HOT_DECAY_SECONDS of recency is
+    worth ten times the votes. The score never changes unless votes do.
+    """
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    age = (created_at - HOT_EPOCH).total_seconds()
+    return math.log10(max(vote_count, 1)) + age / settings.hot_decay_seconds
+
+
+def default_hot_score(context) -> float:
+    params = context.get_current_parameters()
+    return hot_score(params.get("vote_count") or 0, params["created_at"])
+
+
 class User(Base):
     __tablename__ = "users"
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     email: Mapped[str] = mapped_column(String(255), unique=True, nullable=False)
     first_name: Mapped[str | None] = mapped_column(String(100), nullable=True)
     last_name: Mapped[str | None] = mapped_column(String(100), nullable=True)
     password: Mapped[str] = mapped_column(String(255), nullable=False)
+    # Embedded in access tokens; bumping it revokes every token issued before
+    token_version: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+        server_default="0",
+    )
+    # Denormalized count of Follow rows, decides fan-out vs pull-on-read
+    follower_count: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+        server_default="0",
+    )
 
     # Cross-DB safe timestamps
     created_at: Mapped[datetime] = mapped_column(
@@ -41,6 +86,20 @@ class User(Base):
 
 class Post(Base):
     __tablename__ = "posts"
+    # Fetch server-generated columns with INSERT ... RETURNING, not a refresh
+    __mapper_args__ = {"eager_defaults": True}
+    __table_args__ = (
+        # Backs sort=popularity (vote_count DESC, id DESC) as an index scan
+        Index("ix_posts_vote_count_id", "vote_count", "id"),
+        # Global feed: ORDER BY created_at, id with the visibility OR as a filter
+        Index("ix_posts_created_at_id", "created_at", "id"),
+        # /posts/me and the owner side of the visibility filter
+        Index("ix_posts_owner_id_created_at_id", "owner_id", "created_at", "id"),
+        # sort=hot as an index range scan over the precomputed score
+        Index("ix_posts_hot_score_id", "hot_score", "id"),
+        # The hot score refresher reads posts voted on since its watermark
+        Index("ix_posts_voted_at", "voted_at"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     title: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -68,6 +127,29 @@ class Post(Base):
         Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
     )
 
+    # Denormalized count of votes, maintained by the vote router
+    vote_count: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+        server_default="0",
+    )
+
+    # Last vote_count change; votes leave updated_at alone, so Last-Modified
+    # takes the later of the two
+    voted_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
+
+    # hot_score(vote_count, created_at), refreshed after votes by app.ranking
+    hot_score: Mapped[float] = mapped_column(
+        Float,
+        nullable=False,
+        default=default_hot_score,
+        server_default="0",
+    )
+
     # Relationships
     owner: Mapped["User"] = relationship("User", back_populates="posts")
     votes: Mapped[list["Vote"]] = relationship(
@@ -75,8 +157,32 @@ class Post(Base):
     )
 
 
+def post_stats_update(**values):
+    """
+    UPDATE posts setting derived columns: vote counts and hot scores.
+    """
+    posts = Post.__table__
+    # They change with votes, which are not edits, so updated_at keeps its value
+    return update(posts).values(updated_at=posts.c.updated_at, **values)
+
+
+def vote_count_update(delta, voted_at=None):
+    """
+    UPDATE posts moving vote_count by delta and stamping voted_at. delta and
+    voted_at may be bind parameters for executemany.
+    """
+    return post_stats_update(
+        vote_count=Post.__table__.c.vote_count + delta,
+        voted_at=utcnow() if voted_at is None else voted_at,
+    )
+
+
 class Vote(Base):
     __tablename__ = "votes"
+    __table_args__ = (
+        # The primary key leads with user_id, so post lookups need their own index
+        Index("ix_votes_post_id", "post_id"),
+    )
 
     user_id: Mapped[int] = mapped_column(
         Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
@@ -91,3 +197,65 @@ class Vote(Base):
     # Relationships
     user: Mapped["User"] = relationship("User", back_populates="votes")
     post: Mapped["Post"] = relationship("Post", back_populates="votes")
+
+
+class Follow(Base):
+    __tablename__ = "follows"
+    __table_args__ = (
+        # Fan-out looks up an author's followers
+        Index("ix_follows_followed_id", "followed_id"),
+    )
+
+    follower_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    followed_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=utcnow,
+    )
+
+
+class TimelineEntry(Base):
+    """
+    A post fanned out to a follower's home timeline.
+    """
+
+    __tablename__ = "timeline_entries"
+    __table_args__ = (
+        # Home feed pages are a range scan over one user's newest entries
+        Index(
+            "ix_timeline_entries_user_id_post_created_at_post_id",
+            "user_id",
+            "post_created_at",
+            "post_id",
+        ),
+    )
+
+    user_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    post_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("posts.id", ondelete="CASCADE"), primary_key=True
+    )
+    # Copy of Post.created_at, so pages are ordered without reading posts
+    post_created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
+
+
+class Watermark(Base):
+    """
+    How far a background job has processed a timestamp column, shared by all
+    workers.
+    """
+
+    __tablename__ = "watermarks"
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    value: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
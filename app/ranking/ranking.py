@@ -0,0 +1,119 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Iterable
+
+from sqlalchemy import bindparam, or_, select
+
+from app.cache.cache import feed_cache
+from app.config.config import settings
+from app.database.database import AsyncSessionLocal, dialect_insert
+from app.models import models
+
+logger = logging.getLogger(__name__)
+
+REFRESH_BATCH_SIZE = 500
+# Watermarks row holding the newest posts.voted_at already refreshed
+HOT_SCORE_WATERMARK = "hot_scores"
+
+update_hot_score = models.post_stats_update(hot_score=bindparam("score")).where(
+    models.Post.__table__.c.id == bindparam("post_id")
+)
+
+
+async def refresh_hot_scores(post_ids: Iterable[int]) -> int:
+    """
+    Recompute the hot score of the given posts from their current vote_count.
+    """
+    post_ids = list(post_ids)
+    refreshed = 0
+    async with AsyncSessionLocal() as session:
+        for start in range(0, len(post_ids), REFRESH_BATCH_SIZE):
+            batch = post_ids[start : start + REFRESH_BATCH_SIZE]
+            stmt = select(
+                models.Post.id, models.Post.vote_count, models.Post.created_at
+            ).where(models.Post.id.in_(batch))
+            rows = (await session.execute(stmt)).all()
+            if not rows:
+                continue
+            await session.execute(
+                update_hot_score,
+                [
+                    {
+                        "post_id": row.id,
+                        "score": models.hot_score(row.vote_count, row.created_at),
+                    }
+                    for row in rows
+                ],
+            )
+            refreshed += len(rows)
+        await session.commit()
+    return refreshed
+
+
+def voted_posts_query(since: datetime | None):
+    stmt = select(models.Post.id, models.Post.voted_at).where(
+        models.Post.voted_at.is_not(None)
+    )
+    if since is not None:
+        stmt = stmt.where(models.Post.voted_at > since)
+    return stmt
+
+
+def advance_watermark(value: datetime):
+    table = models.Watermark
+    stmt = dialect_insert(table).values(name=HOT_SCORE_WATERMARK, value=value)
+    # Workers refresh concurrently; the watermark only moves forward
+    return stmt.on_conflict_do_update(
+        index_elements=[table.name],
+        set_={"value": stmt.excluded.value},
+        where=or_(table.value.is_(None), table.value < stmt.excluded.value),
+    )
+
+
+async def refresh_voted_hot_scores() -> int:
+    """
+    Refresh the hot score of every post voted on since the stored watermark,
+    then move the watermark to the newest vote seen.
+    """
+    async with AsyncSessionLocal() as session:
+        watermark = await session.scalar(
+            select(models.Watermark.value).where(
+                models.Watermark.name == HOT_SCORE_WATERMARK
+            )
+        )
+        # voted_at is stamped before its transaction commits, and by workers
+        # whose clocks may differ; re-reading a short window behind the
+        # watermark catches those late rows, and recomputing a score is harmless
+        since = None
+        if watermark is not None:
+            since = watermark - timedelta(seconds=settings.hot_refresh_overlap_seconds)
+        rows = (await session.execute(voted_posts_query(since))).all()
+    if not rows:
+        return 0
+
+    refreshed = await refresh_hot_scores(row.id for row in rows)
+    async with AsyncSessionLocal() as session:
+        await session.execute(advance_watermark(max(row.voted_at for row in rows)))
+        await session.commit()
+
+    if refreshed:
+        await feed_cache.invalidate()
+    return refreshed
+
+
+async def run_hot_score_refresher():
+    """
+    Background task: refresh the hot scores of voted posts every interval
+    until cancelled.
+    """
+    try:
+        while True:
+            await asyncio.sleep(settings.hot_refresh_interval_seconds)
+            try:
+                await refresh_voted_hot_scores()
+            except Exception:
+                logger.exception("Hot score refresh failed")
+    finally:
+        # Rank the last votes now rather than at the next start
+        await asyncio.shield(refresh_voted_hot_scores())
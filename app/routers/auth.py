@@ -7,7 +7,7 @@ from app.auth import oauth2
 from app.database.database import get_async_db
 from app.models import models
 from app.schemas import schemas
-from app.utils.utils import verify_password
+from app.utils.utils import verify_password_async
 
 router = APIRouter(tags=["Authentication"])
 
@@ -32,12 +32,18 @@ async def login(
         )
 
     # Verify password
-    if not verify_password(user_credentials.password, str(user.password)):
+    if not await verify_password_async(user_credentials.password, str(user.password)):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Incorrect credentials",
         )
 
     # Generate JWT access token
-    access_token = oauth2.create_access_token(data={"user_email": user.email})
+    access_token = oauth2.create_access_token(
+        data={
+            "sub": str(user.id),
+            "user_email": user.email,
+            "ver": user.token_version,
+        }
+    )
     return {"access_token": access_token, "token_type": "bearer"}
@@ -0,0 +1,11 @@
+from fastapi import APIRouter, Response
+
+from app.metrics import metrics
+
+router = APIRouter(tags=["Metrics"])
+
+
+# -------------------- METRICS --------------------
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    return Response(content=metrics.render_metrics(), media_type=metrics.CONTENT_TYPE)
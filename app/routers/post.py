@@ -1,31 +1,132 @@
 from datetime import datetime
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import and_, desc, func, or_, select
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from pydantic_core import to_jsonable_python
+from sqlalchemy import (
+    and_,
+    column,
+    desc,
+    false,
+    func,
+    literal_column,
+    or_,
+    select,
+    table,
+    update,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
 import app.auth.oauth2 as oauth2
 import app.models.models as models
 import app.schemas.schemas as schemas
-from app.database.database import get_async_db
+from app.cache.cache import feed_cache, feed_flight
+from app.config.config import settings
+from app.database.database import get_async_db, get_read_db, read_from_primary
+from app.timeline import timeline
+from app.utils.utils import (
+    NEXT_CURSOR_HEADER,
+    as_utc,
+    decode_cursor_payload,
+    encode_cursor_payload,
+    fast_json_response,
+    http_date,
+    is_not_modified,
+    invalid_cursor,
+    make_etag,
+    stream_ndjson,
+)
+from app.vote_buffer.vote_buffer import vote_buffer
 
 router = APIRouter(prefix="/posts", tags=["Posts"])
 
+SORT_OPTIONS = ("newest", "oldest", "popularity", "hot", "relevance")
+# Responses are per user; clients may keep them but must revalidate each use
+CONDITIONAL_CACHE_CONTROL = "private, no-cache"
+
+# Columns of schemas.Post plus its owner, for queries that skip the ORM entity;
+# hot_score is only read for cursors and the updated_at columns for ETags
+PLAIN_POST_COLUMNS = (
+    models.Post.id,
+    models.Post.title,
+    models.Post.content,
+    models.Post.published,
+    models.Post.created_at,
+    models.Post.updated_at,
+    models.Post.owner_id,
+    models.Post.hot_score,
+    models.User.first_name.label("owner_first_name"),
+    models.User.last_name.label("owner_last_name"),
+    models.User.email.label("owner_email"),
+    models.User.updated_at.label("owner_updated_at"),
+)
+
+# Full-text objects created by the search migration, not mapped by the ORM
+POSTS_SEARCH_VECTOR = literal_column("posts.search_vector")
+posts_fts = table("posts_fts", column("rowid"), column("rank"))
+
 
 # -------------------- HELPERS --------------------
 
 
 def format_post_with_votes(post_row):
-    post, votes, user_voted_count = post_row
+    post, votes, user_voted = post_row
     return {
         "Post": post,
         "votes": votes,
-        "user_voted": bool(user_voted_count),
+        "user_voted": bool(user_voted),
+    }
+
+
+def format_plain_post_row(post_row) -> dict:
+    """
+    Build the schemas.PostVoted shape straight from a PLAIN_POST_COLUMNS row,
+    with keys in schema order so the JSON matches the validated response.
+    """
+    return {
+        "Post": {
+            "title": post_row.title,
+            "content": post_row.content,
+            "published": post_row.published,
+            "id": post_row.id,
+            "created_at": post_row.created_at,
+            "owner_id": post_row.owner_id,
+            "owner": {
+                "first_name": post_row.owner_first_name,
+                "last_name": post_row.owner_last_name,
+                "email": post_row.owner_email,
+            },
+        },
+        "votes": post_row.votes,
+        "user_voted": bool(post_row.user_voted),
     }
 
 
+def apply_pending_votes(user_id: int, posts: list[dict]) -> list[dict]:
+    """
+    Fold votes still waiting in the write-behind buffer into formatted posts.
+    """
+    if not settings.vote_write_behind:
+        return posts
+    for post in posts:
+        entry = post["Post"]
+        post_id = entry["id"] if isinstance(entry, dict) else entry.id
+        post["votes"] += vote_buffer.delta(post_id)
+        post["user_voted"] = vote_buffer.state(user_id, post_id, post["user_voted"])
+    return posts
+
+
 def check_post_owner(post, current_user):
     if post.owner_id != current_user.id:
         raise HTTPException(
@@ -34,45 +135,200 @@ def check_post_owner(post, current_user):
         )
 
 
+async def get_owned_post(db: AsyncSession, id: int, current_user):
+    post = await db.get(models.Post, id)
+
+    if not post:
+        raise HTTPException(status_code=404, detail=f"Post with id {id} not found")
+
+    check_post_owner(post, current_user)
+    return post
+
+
+def normalize_sort(sort: str, search: str | None = "") -> str:
+    # Unknown values fall back to "newest", same as before cursors existed.
+    # Relevance needs a ranked search, so it only applies with full-text search.
+    if sort == "relevance" and not (
+        search and search.strip() and use_full_text_search()
+    ):
+        return "newest"
+    return sort if sort in SORT_OPTIONS else "newest"
+
+
+def get_sort_key(sort: str):
+    """
+    Return (sort expression, descending) for a normalized sort value.
+    """
+    if sort == "popularity":
+        return models.Post.vote_count, True
+    if sort == "hot":
+        return models.Post.hot_score, True
+    if sort == "oldest":
+        return models.Post.created_at, False
+    return models.Post.created_at, True
+
+
+# -------------------- SEARCH --------------------
+
+
+def use_full_text_search() -> bool:
+    return settings.search_backend == "fulltext"
+
+
+def fts5_match_query(search: str) -> str:
+    # Quote every term so user input can't inject FTS5 syntax; the trailing *
+    # keeps prefix matches close to the old ILIKE behaviour
+    terms = [term.replace('"', '""') for term in search.split()]
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def apply_search(stmt, search: str):
+    """
+    Filter stmt by search and return (stmt, rank ordering or None).
+    """
+    if not use_full_text_search():
+        search_term = f"%{search}%"
+        condition = or_(
+            models.Post.title.ilike(search_term),
+            models.Post.content.ilike(search_term),
+        )
+        return stmt.where(condition), None
+
+    if settings.database_com == "sqlite":
+        match_query = fts5_match_query(search)
+        stmt = stmt.join(posts_fts, posts_fts.c.rowid == models.Post.id).where(
+            literal_column("posts_fts").op("MATCH")(match_query)
+        )
+        # FTS5 rank is bm25, where lower means more relevant
+        return stmt, posts_fts.c.rank.asc()
+
+    ts_query = func.websearch_to_tsquery("english", search)
+    stmt = stmt.where(POSTS_SEARCH_VECTOR.op("@@")(ts_query))
+    return stmt, desc(func.ts_rank_cd(POSTS_SEARCH_VECTOR, ts_query))
+
+
+# -------------------- CURSORS --------------------
+
+
+def encode_cursor(sort: str, value, post_id: int) -> str:
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    return encode_cursor_payload({"s": sort, "v": value, "id": post_id})
+
+
+def decode_cursor(cursor: str, sort: str):
+    """
+    Decode an opaque cursor into (sort value, post id) for the given sort.
+    """
+
+    def parse(data: dict):
+        if data["s"] != sort:
+            raise invalid_cursor()
+        post_id = int(data["id"])
+        if sort == "popularity":
+            value = int(data["v"])
+        elif sort == "hot":
+            value = float(data["v"])
+        else:
+            value = datetime.fromisoformat(data["v"])
+        return value, post_id
+
+    return decode_cursor_payload(cursor, parse)
+
+
+def build_next_cursor(rows, sort: str, limit: int) -> str | None:
+    """
+    Build the cursor pointing after the last row of a full page.
+    """
+    # Relevance ranks are recomputed per query, so that sort is offset-only
+    if not rows or len(rows) < limit or sort == "relevance":
+        return None
+    last_row = rows[-1]
+    # ORM rows lead with the Post entity, plain rows carry its columns
+    post = last_row[0] if isinstance(last_row[0], models.Post) else last_row
+    if sort == "popularity":
+        value = last_row.votes
+    elif sort == "hot":
+        value = post.hot_score
+    else:
+        value = post.created_at
+    return encode_cursor(sort, value, post.id)
+
+
+def keyset_condition(sort: str, cursor: str):
+    sort_column, descending = get_sort_key(sort)
+    value, post_id = decode_cursor(cursor, sort)
+    if descending:
+        return or_(
+            sort_column < value,
+            and_(sort_column == value, models.Post.id < post_id),
+        )
+    return or_(
+        sort_column > value,
+        and_(sort_column == value, models.Post.id > post_id),
+    )
+
+
 def get_posts_query(
-    current_user_id: int,
+    current_user_id: int | None,
     search: str | None = "",
     owner_only: bool = False,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
-    sort: str = "newest",  # 👈 ADD THIS
+    sort: str = "newest",
+    cursor: Optional[str] = None,
+    plain_rows: bool = False,
 ):
+    """
+    Build the feed query. Without a current_user_id it is the public feed:
+    published posts only and user_voted always false.
+    With plain_rows the rows hold PLAIN_POST_COLUMNS instead of a Post entity.
+    """
     # Base visibility
     if owner_only:
         visibility_filter = models.Post.owner_id == current_user_id
+    elif current_user_id is None:
+        visibility_filter = models.Post.published
     else:
         visibility_filter = (models.Post.published) | (
             models.Post.owner_id == current_user_id
         )
 
-    stmt = (
-        select(
-            models.Post,
-            func.count(models.Vote.post_id).label("votes"),
-            func.count(func.nullif(models.Vote.user_id != current_user_id, True)).label(
-                "user_voted"
+    # Vote totals come from the denormalized Post.vote_count; the join only
+    # looks up the current user's own vote, so no grouping is needed
+    votes = models.Post.vote_count.label("votes")
+    if current_user_id is None:
+        user_voted = false().label("user_voted")
+    else:
+        user_voted = models.Vote.user_id.is_not(None).label("user_voted")
+
+    if plain_rows:
+        stmt = (
+            select(*PLAIN_POST_COLUMNS, votes, user_voted)
+            .select_from(models.Post)
+            .join(models.User, models.User.id == models.Post.owner_id)
+        )
+    else:
+        stmt = select(models.Post, votes, user_voted).options(
+            selectinload(models.Post.owner)
+        )
+
+    if current_user_id is not None:
+        stmt = stmt.outerjoin(
+            models.Vote,
+            and_(
+                models.Vote.post_id == models.Post.id,
+                models.Vote.user_id == current_user_id,
             ),
         )
-        .outerjoin(models.Vote, models.Vote.post_id == models.Post.id)
-        .options(selectinload(models.Post.owner))
-    )
 
     filters = [visibility_filter]
 
-    # Search filter
+    # Search filter; whitespace alone is no search on every backend
+    search = (search or "").strip()
+    search_rank = None
     if search:
-        search_term = f"%{search}%"
-        filters.append(
-            or_(
-                models.Post.title.ilike(search_term),
-                models.Post.content.ilike(search_term),
-            )
-        )
+        stmt, search_rank = apply_search(stmt, search)
 
     # Date filter
     if start_date:
@@ -82,18 +338,28 @@ def get_posts_query(
 
     stmt = stmt.where(and_(*filters))
 
-    stmt = stmt.group_by(models.Post.id)
-
     # -------------------- SORTING --------------------
-    if sort == "newest":
-        stmt = stmt.order_by(desc(models.Post.created_at))
-    elif sort == "oldest":
-        stmt = stmt.order_by(models.Post.created_at.asc())
-    elif sort == "popularity":
-        stmt = stmt.order_by(desc(func.count(models.Vote.post_id)))
+    # Post.id breaks ties so that keyset cursors never skip or repeat rows
+    sort = normalize_sort(sort, search)
+    if sort == "relevance":
+        if cursor:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cursor pagination is not supported for sort=relevance",
+            )
+        if search_rank is not None:
+            return stmt.order_by(search_rank, desc(models.Post.id))
+        sort = "newest"
+
+    sort_column, descending = get_sort_key(sort)
+
+    if cursor:
+        stmt = stmt.where(keyset_condition(sort, cursor))
+
+    if descending:
+        stmt = stmt.order_by(desc(sort_column), desc(models.Post.id))
     else:
-        # fallback safety
-        stmt = stmt.order_by(desc(models.Post.created_at))
+        stmt = stmt.order_by(sort_column.asc(), models.Post.id.asc())
 
     return stmt
 
@@ -104,59 +370,392 @@ async def execute_post_query(
     limit: int,
     skip: int,
 ):
-    result = await db.execute(stmt.limit(limit).offset(skip))
+    if skip:
+        stmt = stmt.offset(skip)
+    result = await db.execute(stmt.limit(limit))
     return result.all()
 
 
+def format_feed_rows(rows, plain_rows: bool) -> list[dict]:
+    if plain_rows:
+        return [format_plain_post_row(row) for row in rows]
+    return [format_post_with_votes(row) for row in rows]
+
+
+def feed_response(
+    request: Request,
+    response: Response,
+    posts: list[dict],
+    next_cursor: str | None,
+    versions: list,
+):
+    """
+    Return a feed page, or 304 if the client's ETag still matches. Pages are
+    pre-encoded when fast serialization is enabled.
+    """
+    headers = {
+        "ETag": posts_etag(versions, posts, next_cursor),
+        "Cache-Control": CONDITIONAL_CACHE_CONTROL,
+    }
+    if next_cursor:
+        headers[NEXT_CURSOR_HEADER] = next_cursor
+    if is_not_modified(request.headers, headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    if settings.fast_serialization:
+        return fast_json_response(posts, headers=headers)
+
+    response.headers.update(headers)
+    return posts
+
+
+# -------------------- CONDITIONAL REQUESTS --------------------
+
+
+def post_versions(rows, plain_rows: bool) -> list:
+    """
+    (id, updated_at, owner updated_at) per row, in page order: everything
+    else a page's body depends on, apart from the vote fields.
+    """
+    if plain_rows:
+        return [(row.id, row.updated_at, row.owner_updated_at) for row in rows]
+    return [(row[0].id, row[0].updated_at, row[0].owner.updated_at) for row in rows]
+
+
+def posts_etag(versions: list, posts: list[dict], next_cursor: str | None) -> str:
+    votes = [(post["votes"], post["user_voted"]) for post in posts]
+    return make_etag([versions, votes, next_cursor])
+
+
+def post_last_modified(post, user_id: int) -> datetime | None:
+    """
+    Latest change to the post, its owner or its votes. None while the
+    write-behind buffer holds votes for it, as those have no time yet.
+    """
+    if settings.vote_write_behind and (
+        vote_buffer.delta(post.id) or vote_buffer.state(user_id, post.id) is not None
+    ):
+        return None
+    changes = [post.updated_at, post.owner.updated_at, post.voted_at]
+    return max(as_utc(changed_at) for changed_at in changes if changed_at)
+
+
+# -------------------- FEED CACHE --------------------
+
+
+def unpublished_posts_query(user_id: int):
+    return (
+        select(models.Post.id)
+        .where(models.Post.owner_id == user_id, models.Post.published.is_(False))
+        .limit(1)
+    )
+
+
+def user_voted_ids_query(user_id: int, post_ids: list[int]):
+    return select(models.Vote.post_id).where(
+        models.Vote.user_id == user_id, models.Vote.post_id.in_(post_ids)
+    )
+
+
+async def user_has_unpublished_posts(db: AsyncSession, user_id: int) -> bool:
+    # Owners also see their drafts, so their feed can't come from the shared cache
+    result = await db.execute(unpublished_posts_query(user_id))
+    return result.first() is not None
+
+
+async def get_user_voted_ids(db: AsyncSession, user_id: int, post_ids: list[int]):
+    if not post_ids:
+        return set()
+    result = await db.execute(user_voted_ids_query(user_id, post_ids))
+    return set(result.scalars().all())
+
+
+def serialize_feed_row(post_row) -> dict:
+    """
+    User-independent, JSON-ready form of a plain feed row for the shared cache.
+    """
+    post = format_plain_post_row(post_row)
+    del post["user_voted"]
+    return to_jsonable_python(post)
+
+
+def public_feed_params(
+    sort: str,
+    search: str | None,
+    start_date: Optional[datetime],
+    end_date: Optional[datetime],
+    limit: int,
+    skip: int,
+    cursor: Optional[str],
+) -> list:
+    # A cursor replaces the offset, skip only applies to the legacy path
+    skip = 0 if cursor else skip
+    return [sort, (search or "").strip(), start_date, end_date, limit, skip, cursor]
+
+
+async def get_public_feed_page(
+    db: AsyncSession,
+    limit: int,
+    skip: int,
+    search: str | None,
+    start_date: Optional[datetime],
+    end_date: Optional[datetime],
+    sort: str,
+    cursor: Optional[str],
+) -> dict:
+    """
+    Return {"posts", "next_cursor", "versions"} for a public feed page, from
+    the cache when possible. Posts carry no user_voted flag, so concurrent
+    requests for the same page share a single query.
+    """
+    # Read the generation once, so a page computed before an invalidation is
+    # never stored under the newer generation
+    generation = await feed_cache.generation()
+    skip = 0 if cursor else skip
+    params = public_feed_params(sort, search, start_date, end_date, limit, skip, cursor)
+    if settings.feed_cache_enabled:
+        page = await feed_cache.get(generation, params)
+        if page is not None:
+            return page
+
+    async def load_page() -> dict:
+        stmt = get_posts_query(
+            None,
+            search,
+            start_date=start_date,
+            end_date=end_date,
+            sort=sort,
+            cursor=cursor,
+            plain_rows=True,
+        )
+        rows = await execute_post_query(db, stmt, limit, skip)
+        page = {
+            "posts": [serialize_feed_row(row) for row in rows],
+            "next_cursor": build_next_cursor(rows, sort, limit),
+            "versions": to_jsonable_python(post_versions(rows, True)),
+        }
+        if settings.feed_cache_enabled:
+            await feed_cache.set(generation, params, page)
+        return page
+
+    if not settings.feed_single_flight:
+        return await load_page()
+    return await feed_flight.do(feed_cache.key(generation, params), load_page)
+
+
+# GET /posts requests running in this process, see use_shared_page
+feed_requests_active = 0
+
+
+async def count_feed_request():
+    global feed_requests_active
+    feed_requests_active += 1
+    try:
+        yield
+    finally:
+        feed_requests_active -= 1
+
+
+async def use_shared_page(params: list) -> bool:
+    """
+    Whether GET /posts should build the user-independent page for params. It
+    costs two queries more than the direct one, which only pays off when the
+    page may come from the cache or be shared with a concurrent request.
+    """
+    # Shared pages may come from a lagging replica, and the feed cache and
+    # single-flight keys don't say which; a user who must see their own
+    # writes reads the primary directly
+    if read_from_primary.get():
+        return False
+    if settings.feed_cache_enabled:
+        return True
+    if not settings.feed_single_flight or feed_requests_active <= 1:
+        return False
+
+    # Concurrent readers mostly land on the first page; other pages and
+    # searches only join a query already running for the same key
+    _, search, _, _, _, skip, cursor = params
+    if not (search or skip or cursor):
+        return True
+    generation = await feed_cache.generation()
+    return feed_flight.in_flight(feed_cache.key(generation, params))
+
+
+async def overlay_user_votes(db: AsyncSession, user_id: int, posts: list[dict]):
+    voted_ids = await get_user_voted_ids(
+        db, user_id, [post["Post"]["id"] for post in posts]
+    )
+    return [{**post, "user_voted": post["Post"]["id"] in voted_ids} for post in posts]
+
+
 # -------------------- GET POSTS --------------------
 
 
-@router.get("", response_model=List[schemas.PostVoted])
+@router.get(
+    "",
+    response_model=List[schemas.PostVoted],
+    dependencies=[Depends(count_feed_request)],
+)
 async def get_posts(
-    db: AsyncSession = Depends(get_async_db),
-    current_user=Depends(oauth2.get_current_user),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
+    current_user=Depends(oauth2.get_current_principal),
     limit: int = 50,
     skip: int = 0,
     search: Optional[str] = "",
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
     sort: str = "newest",
+    cursor: Optional[str] = None,
 ):
+    sort = normalize_sort(sort, search)
+
+    params = public_feed_params(sort, search, start_date, end_date, limit, skip, cursor)
+    if await use_shared_page(params) and not await user_has_unpublished_posts(
+        db, current_user.id
+    ):
+        page = await get_public_feed_page(
+            db, limit, skip, search, start_date, end_date, sort, cursor
+        )
+        posts = await overlay_user_votes(db, current_user.id, page["posts"])
+        posts = apply_pending_votes(current_user.id, posts)
+        return feed_response(
+            request, response, posts, page["next_cursor"], page["versions"]
+        )
+
+    plain_rows = settings.fast_serialization
     stmt = get_posts_query(
         current_user.id,
         search,
         start_date=start_date,
         end_date=end_date,
         sort=sort,
+        cursor=cursor,
+        plain_rows=plain_rows,
+    )
+    # A cursor replaces the offset, skip only applies to the legacy path
+    rows = await execute_post_query(db, stmt, limit, 0 if cursor else skip)
+    posts = apply_pending_votes(current_user.id, format_feed_rows(rows, plain_rows))
+    return feed_response(
+        request,
+        response,
+        posts,
+        build_next_cursor(rows, sort, limit),
+        post_versions(rows, plain_rows),
     )
-    posts = await execute_post_query(db, stmt, limit, skip)
-    return [format_post_with_votes(row) for row in posts]
 
 
 @router.get("/me", response_model=List[schemas.PostVoted])
 async def get_my_posts(
-    db: AsyncSession = Depends(get_async_db),
-    current_user=Depends(oauth2.get_current_user),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
+    current_user=Depends(oauth2.get_current_principal),
     limit: int = 50,
     skip: int = 0,
     search: Optional[str] = "",
     sort: str = "newest",
+    cursor: Optional[str] = None,
 ):
+    sort = normalize_sort(sort, search)
+    plain_rows = settings.fast_serialization
     stmt = get_posts_query(
         current_user.id,
         search,
         owner_only=True,
         sort=sort,
+        cursor=cursor,
+        plain_rows=plain_rows,
+    )
+    rows = await execute_post_query(db, stmt, limit, 0 if cursor else skip)
+    posts = apply_pending_votes(current_user.id, format_feed_rows(rows, plain_rows))
+    return feed_response(
+        request,
+        response,
+        posts,
+        build_next_cursor(rows, sort, limit),
+        post_versions(rows, plain_rows),
+    )
+
+
+@router.get("/home", response_model=List[schemas.PostVoted])
+async def get_home_feed(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
+    current_user=Depends(oauth2.get_current_principal),
+    limit: int = 50,
+    cursor: Optional[str] = None,
+):
+    """
+    Newest posts from followed users and the user's own, paged by cursor.
+    """
+    after = decode_cursor(cursor, "newest") if cursor else None
+    result = await db.execute(
+        timeline.home_post_ids_query(current_user.id, limit, after)
+    )
+    post_ids = result.scalars().all()
+
+    plain_rows = settings.fast_serialization
+    rows = []
+    if post_ids:
+        stmt = get_posts_query(
+            current_user.id, sort="newest", plain_rows=plain_rows
+        ).where(models.Post.id.in_(post_ids))
+        rows = await execute_post_query(db, stmt, limit, 0)
+    posts = apply_pending_votes(current_user.id, format_feed_rows(rows, plain_rows))
+    return feed_response(
+        request,
+        response,
+        posts,
+        build_next_cursor(rows, "newest", limit),
+        post_versions(rows, plain_rows),
+    )
+
+
+# -------------------- EXPORT POSTS --------------------
+
+
+@router.get("/export")
+async def export_posts(
+    current_user=Depends(oauth2.get_current_principal),
+    search: Optional[str] = "",
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    owner_only: bool = False,
+    sort: str = "newest",
+):
+    """
+    Stream every post visible to the user as newline-delimited JSON.
+    """
+    stmt = get_posts_query(
+        current_user.id,
+        search,
+        owner_only=owner_only,
+        start_date=start_date,
+        end_date=end_date,
+        sort=sort,
+        plain_rows=True,
+    )
+
+    def format_rows(rows):
+        return apply_pending_votes(
+            current_user.id, [format_plain_post_row(row) for row in rows]
+        )
+
+    return StreamingResponse(
+        stream_ndjson(stmt, format_rows), media_type="application/x-ndjson"
     )
-    posts = await execute_post_query(db, stmt, limit, skip)
-    return [format_post_with_votes(row) for row in posts]
 
 
 @router.get("/{id}", response_model=schemas.PostVoted)
 async def get_post(
     id: int,
-    db: AsyncSession = Depends(get_async_db),
-    current_user=Depends(oauth2.get_current_user),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
+    current_user=Depends(oauth2.get_current_principal),
 ):
     stmt = get_posts_query(current_user.id).where(models.Post.id == id)
     result = await db.execute(stmt)
@@ -165,7 +764,19 @@ async def get_post(
     if not post_row:
         raise HTTPException(status_code=404, detail=f"Post with id {id} not found")
 
-    return format_post_with_votes(post_row)
+    post = apply_pending_votes(current_user.id, [format_post_with_votes(post_row)])[0]
+    headers = {
+        "ETag": posts_etag(post_versions([post_row], False), [post], None),
+        "Cache-Control": CONDITIONAL_CACHE_CONTROL,
+    }
+    last_modified = post_last_modified(post_row[0], current_user.id)
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    if is_not_modified(request.headers, headers["ETag"], last_modified):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    response.headers.update(headers)
+    return post
 
 
 # -------------------- CREATE POST --------------------
@@ -174,13 +785,20 @@ async def get_post(
 @router.post("", response_model=schemas.Post, status_code=status.HTTP_201_CREATED)
 async def create_post(
     post_data: schemas.PostCreate,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_async_db),
     current_user=Depends(oauth2.get_current_user),
 ):
     new_post = models.Post(owner_id=current_user.id, **post_data.model_dump())
     db.add(new_post)
+    # The INSERT returns the generated columns (eager_defaults), and the owner
+    # is the caller, so nothing has to be read back after the commit
     await db.commit()
-    await db.refresh(new_post)
+    await feed_cache.invalidate()
+    set_committed_value(new_post, "owner", current_user)
+    background_tasks.add_task(
+        timeline.fan_out_post, new_post.id, current_user.id, new_post.created_at
+    )
     return new_post
 
 
@@ -197,20 +815,39 @@ async def patch_post(
     db: AsyncSession = Depends(get_async_db),
     current_user=Depends(oauth2.get_current_user),
 ):
-    post = await db.get(models.Post, id)
-
-    if not post:
-        raise HTTPException(status_code=404, detail=f"Post with id {id} not found")
+    update_data = post_data.model_dump(exclude_unset=True)
 
-    check_post_owner(post, current_user)
+    if not update_data:
+        post = await get_owned_post(db, id, current_user)
+        set_committed_value(post, "owner", current_user)
+        return post
 
-    update_data = post_data.model_dump(exclude_unset=True)
+    # Ownership is part of the WHERE clause and RETURNING hands back the
+    # updated row, so the happy path is a single statement
+    stmt = (
+        update(models.Post)
+        .where(models.Post.id == id, models.Post.owner_id == current_user.id)
+        .values(**update_data)
+        .returning(models.Post)
+        .execution_options(populate_existing=True)
+    )
+    result = await db.execute(stmt)
+    post = result.scalar_one_or_none()
 
-    for field, value in update_data.items():
-        setattr(post, field, value)
+    if not post:
+        # Only failures pay for the lookup that tells 404 from 403. The UPDATE
+        # already showed the current user doesn't own the row, so any post
+        # found here belongs to someone else.
+        if await db.get(models.Post, id) is None:
+            raise HTTPException(status_code=404, detail=f"Post with id {id} not found")
+        raise HTTPException(
+            status_code=403,
+            detail="Not authorized to perform this action",
+        )
 
     await db.commit()
-    await db.refresh(post)
+    await feed_cache.invalidate()
+    set_committed_value(post, "owner", current_user)
 
     return post
 
@@ -224,12 +861,8 @@ async def delete_post(
     db: AsyncSession = Depends(get_async_db),
     current_user=Depends(oauth2.get_current_user),
 ):
-    post = await db.get(models.Post, id)
-
-    if not post:
-        raise HTTPException(status_code=404, detail=f"Post with id {id} not found")
-
-    check_post_owner(post, current_user)
+    post = await get_owned_post(db, id, current_user)
 
     await db.delete(post)
     await db.commit()
+    await feed_cache.invalidate()
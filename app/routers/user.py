@@ -1,17 +1,34 @@
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth import oauth2
-from app.database.database import get_async_db  # async session dependency
+from app.cache.cache import feed_cache
+from app.config.config import settings
+from app.database.database import (  # async session dependencies
+    dialect_insert,
+    get_async_db,
+    get_read_db,
+)
 from app.models import models
 from app.schemas import schemas
+from app.timeline import timeline
 from app.utils import utils
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
+# Only the public profile columns are read for listings, never the hash
+PUBLIC_USER_COLUMNS = (
+    models.User.id,
+    models.User.first_name,
+    models.User.last_name,
+    models.User.email,
+)
+
 
 # -------------------- HELPERS --------------------
 async def get_user_by_id(db: AsyncSession, user_id: int):
@@ -37,8 +54,6 @@ def check_current_user(user, current_user):
 async def create_user(
     user_data: schemas.UserCreate, db: AsyncSession = Depends(get_async_db)
 ):
-    user_data.password = utils.hash(user_data.password)
-
     existing_user = await get_user_by_email(db, user_data.email)
     if existing_user:
         raise HTTPException(
@@ -46,19 +61,69 @@ async def create_user(
             detail=f"User with email {user_data.email} already exists",
         )
 
+    user_data.password = await utils.hash_async(user_data.password)
+
     new_user = models.User(**user_data.model_dump())
     db.add(new_user)
+    # The INSERT returns the id (eager_defaults); no refresh needed
     await db.commit()
-    await db.refresh(new_user)
     return new_user
 
 
 # -------------------- GET USERS --------------------
+def encode_user_cursor(user_id: int) -> str:
+    return utils.encode_cursor_payload({"id": user_id})
+
+
+def decode_user_cursor(cursor: str) -> int:
+    return utils.decode_cursor_payload(cursor, lambda data: int(data["id"]))
+
+
+def get_users_query(cursor: Optional[str]):
+    stmt = select(*PUBLIC_USER_COLUMNS).order_by(models.User.id)
+    if cursor:
+        stmt = stmt.where(models.User.id > decode_user_cursor(cursor))
+    return stmt
+
+
+def format_public_user_row(row) -> dict:
+    return {
+        "first_name": row.first_name,
+        "last_name": row.last_name,
+        "email": row.email,
+    }
+
+
 @router.get("", response_model=List[schemas.UserPublic])
-async def get_users(db: AsyncSession = Depends(get_async_db)):
-    stmt = select(models.User)
-    result = await db.execute(stmt)
-    return result.scalars().all()
+async def get_users(
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    stream: bool = False,
+):
+    stmt = get_users_query(cursor)
+    if stream:
+        return StreamingResponse(
+            utils.stream_ndjson(
+                stmt, lambda rows: [format_public_user_row(row) for row in rows]
+            ),
+            media_type="application/x-ndjson",
+        )
+
+    limit = max(1, min(limit, settings.users_page_max_size))
+    result = await db.execute(stmt.limit(limit))
+    rows = result.all()
+    users = [format_public_user_row(row) for row in rows]
+
+    next_cursor = encode_user_cursor(rows[-1].id) if len(rows) == limit else None
+    if settings.fast_serialization:
+        headers = {utils.NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+        return utils.fast_json_response(users, headers=headers)
+
+    if next_cursor:
+        response.headers[utils.NEXT_CURSOR_HEADER] = next_cursor
+    return users
 
 
 @router.get("/{id}", response_model=schemas.UserOut)
@@ -91,6 +156,7 @@ async def get_my_profile(
 async def delete_user(
     id: int,
     user_data: schemas.UserDelete,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_async_db),
     current_user=Depends(oauth2.get_current_user),
 ):
@@ -100,11 +166,110 @@ async def delete_user(
 
     check_current_user(user, current_user)
 
-    if not utils.pwd_context.verify(user_data.password, user.password):
+    if not await utils.verify_password_async(user_data.password, user.password):
         raise HTTPException(status_code=401, detail="Incorrect password")
 
+    # The user's votes are removed with them, so release their counts first
+    voted_posts = select(models.Vote.post_id).where(models.Vote.user_id == user.id)
+    await db.execute(
+        models.vote_count_update(-1).where(models.Post.id.in_(voted_posts))
+    )
+
+    # Follows cascade away as well
+    followed_users = select(models.Follow.followed_id).where(
+        models.Follow.follower_id == user.id
+    )
+    result = await db.execute(
+        follower_count_update(-1)
+        .where(models.User.id.in_(followed_users))
+        .returning(models.User.id, models.User.follower_count)
+    )
+    refanned_authors = [
+        author_id
+        for author_id, follower_count in result.all()
+        if timeline.crossed_into_fanout(follower_count)
+    ]
+
     await db.delete(user)
     await db.commit()
+    oauth2.invalidate_cached_user(user.email, user.id)
+    await feed_cache.invalidate()
+    for author_id in refanned_authors:
+        background_tasks.add_task(timeline.backfill_author, author_id)
+
+
+# -------------------- FOLLOW --------------------
+def follower_count_update(delta: int):
+    return update(models.User).values(
+        follower_count=models.User.follower_count + delta,
+        updated_at=models.User.updated_at,
+    )
+
+
+@router.post("/{id}/follow", status_code=status.HTTP_201_CREATED)
+async def follow_user(
+    id: int,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(oauth2.get_current_user),
+):
+    if id == current_user.id:
+        raise HTTPException(status_code=400, detail="You cannot follow yourself")
+
+    stmt = (
+        dialect_insert(models.Follow)
+        .values(follower_id=current_user.id, followed_id=id)
+        .on_conflict_do_nothing()
+        .returning(models.Follow.followed_id)
+    )
+    try:
+        result = await db.execute(stmt)
+        followed = result.scalar_one_or_none() is not None
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=404, detail="User not found")
+
+    if not followed:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"You already follow user {id}",
+        )
+
+    await db.execute(follower_count_update(1).where(models.User.id == id))
+    await db.commit()
+    background_tasks.add_task(timeline.backfill_follow, current_user.id, id)
+    return {"message": f"Now following user {id}"}
+
+
+@router.delete("/{id}/follow", status_code=status.HTTP_204_NO_CONTENT)
+async def unfollow_user(
+    id: int,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(oauth2.get_current_user),
+):
+    stmt = (
+        delete(models.Follow)
+        .where(
+            models.Follow.follower_id == current_user.id,
+            models.Follow.followed_id == id,
+        )
+        .returning(models.Follow.followed_id)
+    )
+    result = await db.execute(stmt)
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(status_code=404, detail="You do not follow this user")
+
+    result = await db.execute(
+        follower_count_update(-1)
+        .where(models.User.id == id)
+        .returning(models.User.follower_count)
+    )
+    follower_count = result.scalar_one()
+    await timeline.remove_followed_posts(db, current_user.id, id)
+    await db.commit()
+    if timeline.crossed_into_fanout(follower_count):
+        background_tasks.add_task(timeline.backfill_author, id)
 
 
 # -------------------- PATCH USER --------------------
@@ -115,13 +280,16 @@ async def patch_user(
     db: AsyncSession = Depends(get_async_db),
     current_user=Depends(oauth2.get_current_user),
 ):
-    user = await get_user_by_id(db, id)
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    check_current_user(user, current_user)
+    # Users may only patch themselves, so current_user is the row to update
+    if id != current_user.id:
+        user = await get_user_by_id(db, id)
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        check_current_user(user, current_user)
+    user = current_user
 
     update_data = user_data.model_dump(exclude_unset=True)
+    update_data.pop("current_password", None)
 
     if "email" in update_data:
         existing_user = await get_user_by_email(db, update_data["email"])
@@ -139,18 +307,37 @@ async def patch_user(
                 detail="Current password required",
             )
 
-        if not utils.pwd_context.verify(user_data.current_password, user.password):
+        if not await utils.verify_password_async(
+            user_data.current_password, user.password
+        ):
             raise HTTPException(
                 status_code=400,
                 detail="Current password is incorrect",
             )
 
-        update_data["password"] = utils.hash(update_data["password"])
+        update_data["password"] = await utils.hash_async(update_data["password"])
 
-    for field, value in update_data.items():
-        setattr(user, field, value)
+    if not update_data:
+        return user
+
+    # Tokens embed the email and were issued against the old password
+    if "email" in update_data or "password" in update_data:
+        update_data["token_version"] = models.User.token_version + 1
+
+    previous_email = user.email
+    stmt = (
+        update(models.User)
+        .where(models.User.id == user.id)
+        .values(**update_data)
+        .returning(models.User)
+        .execution_options(populate_existing=True)
+    )
+    result = await db.execute(stmt)
+    user = result.scalar_one()
 
     await db.commit()
-    await db.refresh(user)
+    oauth2.invalidate_cached_user(previous_email, user.id)
+    # Cached feed pages embed the owner's public profile
+    await feed_cache.invalidate()
 
     return user
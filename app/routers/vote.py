@@ -1,28 +1,202 @@
+from typing import List
+
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import delete, select
+from sqlalchemy import and_, delete, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth import oauth2
-from app.database.database import get_async_db
+from app.cache.cache import feed_cache
+from app.config.config import settings
+from app.database.database import dialect_insert, get_async_db
 from app.models import models
 from app.schemas import schemas
+from app.vote_buffer.vote_buffer import vote_buffer
 
 router = APIRouter(prefix="/vote", tags=["Vote"])
 
 
 # -------------------- HELPERS --------------------
-async def get_post(db: AsyncSession, post_id: int):
-    stmt = select(models.Post).where(models.Post.id == post_id)
+async def adjust_vote_count(db: AsyncSession, post_id: int, delta: int):
+    # Runs inside the caller's transaction so the counter commits with the vote
+    stmt = models.vote_count_update(delta).where(models.Post.id == post_id)
+    await db.execute(stmt)
+
+
+async def apply_vote_change(db: AsyncSession, change_stmt, delta: int) -> bool:
+    """
+    Run an INSERT/DELETE ... RETURNING post_id on votes and bump the post's
+    vote_count by delta if a row was affected. Returns whether one was.
+    """
+    if settings.database_com == "sqlite":
+        # SQLite has no DML in CTEs, so the counter is a second statement
+        result = await db.execute(change_stmt)
+        post_id = result.scalar_one_or_none()
+        if post_id is None:
+            return False
+        await adjust_vote_count(db, post_id, delta)
+        return True
+
+    changed = change_stmt.cte("changed_vote")
+    stmt = (
+        models.vote_count_update(delta)
+        .where(models.Post.id == changed.c.post_id)
+        .returning(models.Post.id)
+        .execution_options(synchronize_session=False)
+    )
     result = await db.execute(stmt)
-    return result.scalar_one_or_none()
+    return result.scalar_one_or_none() is not None
+
+
+async def add_vote(db: AsyncSession, post_id: int, user_id: int) -> bool:
+    """
+    Insert a vote; False if it already existed. A missing post surfaces as an
+    IntegrityError from the votes.post_id foreign key.
+    """
+    stmt = (
+        dialect_insert(models.Vote)
+        .values(post_id=post_id, user_id=user_id)
+        .on_conflict_do_nothing()
+        .returning(models.Vote.post_id)
+    )
+    return await apply_vote_change(db, stmt, 1)
 
 
-async def get_user_vote(db: AsyncSession, post_id: int, user_id: int):
-    stmt = select(models.Vote).where(
-        models.Vote.post_id == post_id, models.Vote.user_id == user_id
+async def remove_vote(db: AsyncSession, post_id: int, user_id: int) -> bool:
+    stmt = (
+        delete(models.Vote)
+        .where(models.Vote.post_id == post_id, models.Vote.user_id == user_id)
+        .returning(models.Vote.post_id)
+    )
+    return await apply_vote_change(db, stmt, -1)
+
+
+async def get_vote_states(db: AsyncSession, post_ids: set[int], user_id: int):
+    """
+    Map each existing post in post_ids to whether user_id has voted on it.
+    """
+    stmt = (
+        select(models.Post.id, models.Vote.user_id.is_not(None))
+        .outerjoin(
+            models.Vote,
+            and_(
+                models.Vote.post_id == models.Post.id,
+                models.Vote.user_id == user_id,
+            ),
+        )
+        .where(models.Post.id.in_(post_ids))
     )
     result = await db.execute(stmt)
-    return result.scalar_one_or_none()
+    return {post_id: bool(voted) for post_id, voted in result.all()}
+
+
+async def bulk_add_votes(db: AsyncSession, post_ids: set[int], user_id: int):
+    stmt = (
+        dialect_insert(models.Vote)
+        .values([{"post_id": post_id, "user_id": user_id} for post_id in post_ids])
+        .on_conflict_do_nothing()
+        .returning(models.Vote.post_id)
+    )
+    result = await db.execute(stmt)
+    return set(result.scalars().all())
+
+
+async def bulk_remove_votes(db: AsyncSession, post_ids: set[int], user_id: int):
+    stmt = (
+        delete(models.Vote)
+        .where(models.Vote.user_id == user_id, models.Vote.post_id.in_(post_ids))
+        .returning(models.Vote.post_id)
+    )
+    result = await db.execute(stmt)
+    return set(result.scalars().all())
+
+
+async def bulk_adjust_vote_counts(db: AsyncSession, post_ids: set[int], delta: int):
+    if not post_ids:
+        return
+    stmt = models.vote_count_update(delta).where(models.Post.id.in_(post_ids))
+    await db.execute(stmt.execution_options(synchronize_session=False))
+
+
+def vote_result(vote: schemas.Vote, status_code: int, detail: str):
+    return schemas.VoteResult(
+        post_id=vote.post_id, dir=vote.dir, status_code=status_code, detail=detail
+    )
+
+
+def conflict_result(vote: schemas.Vote, user_id: int):
+    if vote.dir == 1:
+        detail = f"User {user_id} has already voted on post {vote.post_id}"
+    else:
+        detail = f"User {user_id} has already removed their vote on post {vote.post_id}"
+    return vote_result(vote, status.HTTP_409_CONFLICT, detail)
+
+
+def resolve_vote_batch(
+    votes: List[schemas.Vote], states: dict[int, bool], user_id: int
+):
+    """
+    Replay votes in order against the current vote states, updating states in
+    place to the final state and returning one result per item.
+    """
+    results = []
+    for vote in votes:
+        if vote.post_id not in states:
+            results.append(
+                vote_result(vote, status.HTTP_404_NOT_FOUND, "Post not found")
+            )
+        elif vote.dir == 1 and states[vote.post_id]:
+            results.append(
+                vote_result(
+                    vote,
+                    status.HTTP_409_CONFLICT,
+                    f"User {user_id} has already voted on post {vote.post_id}",
+                )
+            )
+        elif vote.dir == 1:
+            states[vote.post_id] = True
+            results.append(
+                vote_result(vote, status.HTTP_201_CREATED, "Successfully voted")
+            )
+        elif not states[vote.post_id]:
+            results.append(
+                vote_result(
+                    vote, status.HTTP_404_NOT_FOUND, "You have not voted on this post"
+                )
+            )
+        else:
+            states[vote.post_id] = False
+            results.append(
+                vote_result(vote, status.HTTP_201_CREATED, "Vote removed successfully")
+            )
+    return results
+
+
+async def buffer_votes(db: AsyncSession, votes: List[schemas.Vote], user_id: int):
+    """
+    Write-behind path: resolve votes against the table overlaid with pending
+    buffered votes, then buffer the changed ones instead of writing them.
+    """
+    stored = await get_vote_states(db, {vote.post_id for vote in votes}, user_id)
+    initial_states = {
+        post_id: vote_buffer.state(user_id, post_id, default=voted)
+        for post_id, voted in stored.items()
+    }
+    final_states = dict(initial_states)
+    results = resolve_vote_batch(votes, final_states, user_id)
+    conflicted = set()
+    for post_id, voted in final_states.items():
+        if voted == initial_states[post_id]:
+            continue
+        if not await vote_buffer.record(user_id, post_id, voted, stored[post_id]):
+            # A concurrent request got there first; our changes did not apply
+            conflicted.add(post_id)
+    return [
+        conflict_result(vote, user_id)
+        if vote.post_id in conflicted and result.status_code == status.HTTP_201_CREATED
+        else result
+        for vote, result in zip(votes, results)
+    ]
 
 
 # -------------------- VOTE ENDPOINT --------------------
@@ -32,37 +206,98 @@ async def vote(
     db: AsyncSession = Depends(get_async_db),
     current_user=Depends(oauth2.get_current_user),
 ):
-    # Ensure post exists
-    post = await get_post(db, vote.post_id)
-    if not post:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Post not found"
-        )
-
-    # Check existing vote
-    existing_vote = await get_user_vote(db, vote.post_id, current_user.id)
+    if settings.vote_write_behind:
+        (result,) = await buffer_votes(db, [vote], current_user.id)
+        if result.status_code != status.HTTP_201_CREATED:
+            raise HTTPException(status_code=result.status_code, detail=result.detail)
+        return {"message": result.detail}
 
     if vote.dir == 1:  # Add vote
-        if existing_vote:
+        try:
+            added = await add_vote(db, vote.post_id, current_user.id)
+        except IntegrityError:
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Post not found"
+            )
+
+        if not added:
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail=f"User {current_user.id} has already voted on post {vote.post_id}",
             )
-        new_vote = models.Vote(post_id=vote.post_id, user_id=current_user.id)
-        db.add(new_vote)
         await db.commit()
+        await feed_cache.invalidate()
         return {"message": "Successfully voted"}
 
     else:  # Remove vote
-        if not existing_vote:
+        if not await remove_vote(db, vote.post_id, current_user.id):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="You have not voted on this post",
             )
-        stmt = delete(models.Vote).where(
-            models.Vote.post_id == vote.post_id,
-            models.Vote.user_id == current_user.id,
-        )
-        await db.execute(stmt)
         await db.commit()
+        await feed_cache.invalidate()
         return {"message": "Vote removed successfully"}
+
+
+# -------------------- BATCH VOTE ENDPOINT --------------------
+@router.post("/batch", response_model=List[schemas.VoteResult])
+async def vote_batch(
+    votes: List[schemas.Vote],
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(oauth2.get_current_user),
+):
+    """
+    Apply queued votes in order within one transaction.
+    Each item gets the status the single /vote endpoint would have returned.
+    """
+    if len(votes) > settings.vote_batch_max_size:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.vote_batch_max_size} votes per batch",
+        )
+    if not votes:
+        return []
+    if settings.vote_write_behind:
+        return await buffer_votes(db, votes, current_user.id)
+
+    initial_states = await get_vote_states(
+        db, {vote.post_id for vote in votes}, current_user.id
+    )
+    final_states = dict(initial_states)
+    results = resolve_vote_batch(votes, final_states, current_user.id)
+
+    to_add = {
+        post_id
+        for post_id, voted in final_states.items()
+        if voted and not initial_states[post_id]
+    }
+    to_remove = {
+        post_id
+        for post_id, voted in final_states.items()
+        if not voted and initial_states[post_id]
+    }
+
+    # RETURNING reports what actually changed, so concurrent single votes
+    # can't push the counters out of sync
+    added = removed = set()
+    try:
+        if to_add:
+            added = await bulk_add_votes(db, to_add, current_user.id)
+            await bulk_adjust_vote_counts(db, added, 1)
+        if to_remove:
+            removed = await bulk_remove_votes(db, to_remove, current_user.id)
+            await bulk_adjust_vote_counts(db, removed, -1)
+    except IntegrityError:
+        # A post was deleted between the lookup and the insert
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Posts changed while applying the batch, please retry",
+        )
+
+    await db.commit()
+    if to_add or to_remove:
+        await feed_cache.invalidate()
+    return results
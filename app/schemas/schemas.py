@@ -128,8 +128,22 @@ class Token(BaseModel):
 
 class TokenData(BaseModel):
     email: Optional[str] = None
+    id: Optional[int] = None
+    version: Optional[int] = None
+
+
+class Principal(BaseModel):
+    id: int
+    email: str
 
 
 class Vote(BaseModel):
     post_id: int
     dir: bool  # True = vote, False = remove vote
+
+
+class VoteResult(BaseModel):
+    post_id: int
+    dir: bool
+    status_code: int
+    detail: str
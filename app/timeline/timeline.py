@@ -0,0 +1,195 @@
+from datetime import datetime
+
+from sqlalchemy import and_, delete, desc, exists, literal, or_, select, union
+
+from app.config.config import settings
+from app.database.database import AsyncSessionLocal, dialect_insert
+from app.models import models
+
+timeline = models.TimelineEntry
+
+
+def insert_entries(entries):
+    # Fan-out and follow backfill can race on the same post; keep either copy
+    return (
+        dialect_insert(timeline)
+        .from_select(["user_id", "post_id", "post_created_at"], entries)
+        .on_conflict_do_nothing()
+    )
+
+
+def is_pulled_author(follower_count: int) -> bool:
+    # Authors above the limit are never fanned out; followers pull their posts.
+    # Crossing the limit upwards needs nothing: reads pull every post of the
+    # author and the UNION drops the copies already fanned out. Falling back
+    # under it, backfill_author copies the posts written while pulled.
+    return follower_count > settings.timeline_fanout_max_followers
+
+
+def crossed_into_fanout(follower_count: int) -> bool:
+    # After losing one follower: the author was pulled and no longer is
+    return follower_count == settings.timeline_fanout_max_followers
+
+
+def recent_posts_query(author_id: int):
+    return (
+        select(models.Post.id, models.Post.created_at)
+        .where(models.Post.owner_id == author_id)
+        .order_by(desc(models.Post.created_at), desc(models.Post.id))
+        .limit(settings.timeline_backfill_size)
+    )
+
+
+# -------------------- FAN-OUT ON WRITE --------------------
+
+
+async def fan_out_post(post_id: int, owner_id: int, created_at: datetime):
+    """
+    Copy a new post into the timeline of every follower of its author.
+    Runs after the response, on its own session.
+    """
+    async with AsyncSessionLocal() as session:
+        follower_count = await session.scalar(
+            select(models.User.follower_count).where(models.User.id == owner_id)
+        )
+        if follower_count is None or is_pulled_author(follower_count):
+            return
+
+        followers = select(
+            models.Follow.follower_id,
+            literal(post_id),
+            literal(created_at, models.Post.created_at.type),
+        ).where(models.Follow.followed_id == owner_id)
+        await session.execute(insert_entries(followers))
+        await session.commit()
+
+
+async def backfill_follow(follower_id: int, followed_id: int):
+    """
+    Seed a new follower's timeline with the author's most recent posts.
+    """
+    async with AsyncSessionLocal() as session:
+        follower_count = await session.scalar(
+            select(models.User.follower_count).where(models.User.id == followed_id)
+        )
+        if follower_count is None or is_pulled_author(follower_count):
+            return
+
+        # An unfollow may have committed since the follow; its cleanup has
+        # already run, so only copy posts while the follow still exists
+        still_following = exists().where(
+            models.Follow.follower_id == follower_id,
+            models.Follow.followed_id == followed_id,
+        )
+        recent = recent_posts_query(followed_id).subquery()
+        entries = select(literal(follower_id), recent.c.id, recent.c.created_at).where(
+            still_following
+        )
+        await session.execute(insert_entries(entries))
+        await session.commit()
+
+
+async def backfill_author(author_id: int):
+    """
+    Copy an author's most recent posts to all their followers, after they fell
+    back under the fan-out limit. Posts written while they were pulled were
+    never fanned out.
+    """
+    async with AsyncSessionLocal() as session:
+        follower_count = await session.scalar(
+            select(models.User.follower_count).where(models.User.id == author_id)
+        )
+        if follower_count is None or is_pulled_author(follower_count):
+            return
+
+        recent = recent_posts_query(author_id).subquery()
+        entries = select(
+            models.Follow.follower_id, recent.c.id, recent.c.created_at
+        ).where(models.Follow.followed_id == author_id)
+        await session.execute(insert_entries(entries))
+        await session.commit()
+
+
+async def remove_followed_posts(db, follower_id: int, followed_id: int):
+    """
+    Drop an unfollowed author's posts from the follower's timeline.
+    """
+    authored = select(models.Post.id).where(models.Post.owner_id == followed_id)
+    await db.execute(
+        delete(timeline).where(
+            timeline.user_id == follower_id, timeline.post_id.in_(authored)
+        )
+    )
+
+
+# -------------------- READ --------------------
+
+
+def home_post_ids_query(user_id: int, limit: int, after=None):
+    """
+    Ids of the newest home feed posts: the user's fanned-out timeline, merged
+    with posts pulled from their own and high-follower authors' profiles.
+    Each side reads at most `limit` rows from an index, whatever the totals.
+    after is an optional (created_at, post_id) keyset position.
+    """
+    visible = or_(models.Post.published, models.Post.owner_id == user_id)
+
+    pushed = (
+        select(
+            timeline.post_id.label("post_id"),
+            timeline.post_created_at.label("created_at"),
+        )
+        .join(models.Post, models.Post.id == timeline.post_id)
+        .where(timeline.user_id == user_id, visible)
+    )
+
+    pulled_authors = (
+        select(models.Follow.followed_id)
+        .join(models.User, models.User.id == models.Follow.followed_id)
+        .where(
+            models.Follow.follower_id == user_id,
+            models.User.follower_count > settings.timeline_fanout_max_followers,
+        )
+    )
+    pulled = select(
+        models.Post.id.label("post_id"), models.Post.created_at.label("created_at")
+    ).where(
+        or_(models.Post.owner_id == user_id, models.Post.owner_id.in_(pulled_authors)),
+        visible,
+    )
+
+    if after is not None:
+        created_at, post_id = after
+        pushed = pushed.where(
+            or_(
+                timeline.post_created_at < created_at,
+                and_(
+                    timeline.post_created_at == created_at,
+                    timeline.post_id < post_id,
+                ),
+            )
+        )
+        pulled = pulled.where(
+            or_(
+                models.Post.created_at < created_at,
+                and_(models.Post.created_at == created_at, models.Post.id < post_id),
+            )
+        )
+
+    pushed = (
+        pushed.order_by(desc(timeline.post_created_at), desc(timeline.post_id))
+        .limit(limit)
+        .subquery()
+    )
+    pulled = (
+        pulled.order_by(desc(models.Post.created_at), desc(models.Post.id))
+        .limit(limit)
+        .subquery()
+    )
+    # UNION also drops posts that are in both (author crossed the limit)
+    merged = union(select(pushed), select(pulled)).subquery()
+    return (
+        select(merged.c.post_id)
+        .order_by(desc(merged.c.created_at), desc(merged.c.post_id))
+        .limit(limit)
+    )
@@ -1,9 +1,37 @@
+import asyncio
+import base64
+import binascii
+import hashlib
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Callable
+
+from fastapi import HTTPException, Response, status
 from pwdlib import PasswordHash
+from pydantic_core import to_json
 from pwdlib.hashers.argon2 import Argon2Hasher
 
+from app.config.config import settings
+from app.database.database import open_read_session
+
 # Initialize Argon2 password hasher
 pwd_context = PasswordHash((Argon2Hasher(),))
 
+# Argon2 releases the GIL, so a small dedicated pool keeps hashing off the
+# event loop; the semaphore queues callers beyond the configured limit
+HASH_CONCURRENCY: int = settings.password_hash_concurrency
+_hash_executor = ThreadPoolExecutor(
+    max_workers=HASH_CONCURRENCY, thread_name_prefix="argon2"
+)
+_hash_semaphore = asyncio.Semaphore(HASH_CONCURRENCY)
+_hash_queued = 0
+_hash_active = 0
+# Completed hashes with time spent waiting for a slot and hashing, in seconds
+_hash_timing = {"count": 0, "wait_time": 0.0, "hash_time": 0.0}
+
 
 def hash(password: str) -> str:
     """
@@ -17,3 +45,164 @@ def verify_password(password: str, hashed_password: str) -> bool:
     Verify a plain text password against a hashed password.
     """
     return pwd_context.verify(password, hashed_password)
+
+
+async def _run_hasher(func, *args):
+    global _hash_queued, _hash_active
+
+    _hash_queued += 1
+    queued_at = time.perf_counter()
+    try:
+        await _hash_semaphore.acquire()
+    finally:
+        _hash_queued -= 1
+
+    _hash_active += 1
+    started_at = time.perf_counter()
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_hash_executor, func, *args)
+    finally:
+        _hash_active -= 1
+        _hash_semaphore.release()
+        _hash_timing["count"] += 1
+        _hash_timing["wait_time"] += started_at - queued_at
+        _hash_timing["hash_time"] += time.perf_counter() - started_at
+
+
+async def hash_async(password: str) -> str:
+    """
+    Hash a password on the Argon2 pool without blocking the event loop.
+    """
+    return await _run_hasher(hash, password)
+
+
+async def verify_password_async(password: str, hashed_password: str) -> bool:
+    """
+    Verify a password on the Argon2 pool without blocking the event loop.
+    """
+    return await _run_hasher(verify_password, password, hashed_password)
+
+
+def hash_stats() -> dict:
+    """
+    Current Argon2 pool usage: running hashes and callers waiting for a slot,
+    plus totals for completed hashes.
+    """
+    return {
+        "limit": HASH_CONCURRENCY,
+        "active": _hash_active,
+        "queued": _hash_queued,
+        **_hash_timing,
+    }
+
+
+def fast_json_response(content, headers: dict | None = None) -> Response:
+    """
+    Encode data that already has the response model's shape with pydantic-core,
+    skipping FastAPI's response_model validation.
+    """
+    return Response(
+        content=to_json(content), media_type="application/json", headers=headers
+    )
+
+
+# -------------------- CURSORS --------------------
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def invalid_cursor() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+    )
+
+
+def encode_cursor_payload(data: dict) -> str:
+    raw = json.dumps(data, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor_payload(cursor: str, parse: Callable[[dict], Any]) -> Any:
+    """
+    Decode an opaque cursor and parse its payload; any malformed cursor is a 400.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return parse(json.loads(base64.urlsafe_b64decode(padded)))
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise invalid_cursor()
+
+
+# -------------------- NDJSON EXPORT --------------------
+
+
+async def stream_ndjson(stmt, format_rows: Callable[[list], list]):
+    """
+    Yield NDJSON lines for stmt, one server-side cursor batch at a time.
+    """
+    # A dedicated session keeps the cursor open for the whole response,
+    # independent of when request dependencies are torn down
+    async with await open_read_session() as session:
+        result = await session.stream(
+            stmt.execution_options(yield_per=settings.export_batch_size)
+        )
+        async for rows in result.partitions():
+            yield b"".join(to_json(item) + b"\n" for item in format_rows(rows))
+
+
+# -------------------- CONDITIONAL REQUESTS --------------------
+
+
+def make_etag(state) -> str:
+    """
+    Weak ETag over the values a response is built from, so it can be checked
+    without building or encoding the body.
+    """
+    digest = hashlib.blake2b(to_json(state), digest_size=16).hexdigest()
+    return f'W/"{digest}"'
+
+
+def as_utc(value: datetime) -> datetime:
+    # SQLite returns naive datetimes, stored as UTC
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def http_date(value: datetime) -> str:
+    return format_datetime(as_utc(value), usegmt=True)
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match uses the weak comparison: W/ prefixes are ignored
+    if if_none_match.strip() == "*":
+        return True
+    opaque_tag = etag.removeprefix("W/")
+    return any(
+        tag.strip().removeprefix("W/") == opaque_tag for tag in if_none_match.split(",")
+    )
+
+
+def not_modified_since(if_modified_since: str, last_modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        # Invalid dates are ignored, as if the header was absent
+        return False
+    # HTTP dates have whole seconds
+    return as_utc(last_modified).replace(microsecond=0) <= as_utc(since)
+
+
+def is_not_modified(headers, etag: str, last_modified: datetime | None = None) -> bool:
+    """
+    Whether a GET can be answered with 304. If-None-Match, when sent, takes
+    precedence over If-Modified-Since.
+    """
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since is not None and last_modified is not None:
+        return not_modified_since(if_modified_since, last_modified)
+    return False
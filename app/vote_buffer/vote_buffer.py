@@ -0,0 +1,389 @@
+import asyncio
+import json
+import logging
+import os
+from collections import Counter
+from contextlib import suppress
+
+from sqlalchemy import bindparam, delete, select, tuple_
+
+from app.cache.cache import feed_cache
+from app.config.config import settings
+from app.database.database import AsyncSessionLocal, dialect_insert
+from app.models import models
+
+logger = logging.getLogger(__name__)
+
+DURABILITY_MODES = ("memory", "log", "fsync")
+# Workers sharing a log path each claim a numbered slot: path, path.1, ...
+MAX_LOG_SLOTS = 256
+
+update_vote_count = models.vote_count_update(
+    bindparam("delta"), bindparam("voted_at")
+).where(models.Post.__table__.c.id == bindparam("post_id"))
+
+
+class VoteBuffer:
+    """
+    Write-behind buffer for votes.
+
+    Each (user_id, post_id) maps to (voted, stored): the state the user asked
+    for and the state the table had when it was buffered, so reads can add the
+    pending difference to vote_count. Only the last vote per pair is written.
+    """
+
+    def __init__(self, durability: str, log_path: str):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Unknown vote buffer durability: {durability}")
+        self.durability = durability
+        self.base_log_path = log_path
+        self.log_path = log_path
+        self.flushing_path = f"{log_path}.flushing"
+        self.pending: dict[tuple[int, int], tuple[bool, bool | None]] = {}
+        self.flushing: dict[tuple[int, int], tuple[bool, bool | None]] = {}
+        self.pending_deltas: Counter[int] = Counter()
+        self.flushing_deltas: Counter[int] = Counter()
+        self.full = asyncio.Event()
+        self.flushed = 0
+        self.failures = 0
+        self._lock = asyncio.Lock()
+        self._log = None
+        self._slot_lock = None
+        self._flush_running = False
+
+    # -------------------- READ --------------------
+
+    def state(self, user_id: int, post_id: int, default: bool | None = None):
+        """
+        Buffered vote state of the pair, or default if nothing is pending.
+        """
+        key = (user_id, post_id)
+        entry = self.pending.get(key) or self.flushing.get(key)
+        return default if entry is None else entry[0]
+
+    def delta(self, post_id: int) -> int:
+        return self.pending_deltas[post_id] + self.flushing_deltas[post_id]
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self.pending),
+            "flushing": len(self.flushing),
+            "flushed": self.flushed,
+            "failures": self.failures,
+        }
+
+    # -------------------- WRITE --------------------
+
+    async def record(
+        self, user_id: int, post_id: int, voted: bool, stored: bool
+    ) -> bool:
+        """
+        Buffer a vote unless the pair is already in that state. stored is the
+        table's state for the pair, as just read. Returns whether the vote was
+        buffered, once it is as durable as the configured mode allows.
+        """
+        async with self._lock:
+            # Checked under the lock: a concurrent request for the same pair
+            # may have buffered this state since the caller read it
+            if self.state(user_id, post_id, default=stored) == voted:
+                return False
+            if self.durability != "memory":
+                line = json.dumps(
+                    {"user_id": user_id, "post_id": post_id, "voted": voted}
+                )
+                await self._append(line + "\n")
+            self._set((user_id, post_id), voted, stored)
+        if len(self.pending) >= settings.vote_buffer_max_pending:
+            self.full.set()
+        return True
+
+    def _set(self, key: tuple[int, int], voted: bool, stored: bool | None):
+        previous = self.pending.get(key)
+        if previous is not None:
+            stored = previous[1]
+            self.pending_deltas[key[1]] -= contribution(previous)
+        elif key in self.flushing:
+            # The table will hold the flushing state once that flush commits
+            stored = self.flushing[key][0]
+        self.pending[key] = (voted, stored)
+        self.pending_deltas[key[1]] += contribution((voted, stored))
+
+    async def _append(self, line: str):
+        if self._slot_lock is None:
+            self.load()
+        self._write_log(line)
+        if self.durability == "fsync":
+            await asyncio.to_thread(os.fsync, self._log.fileno())
+
+    def _write_log(self, text: str):
+        if self._log is None:
+            self._log = open(self.log_path, "a", encoding="utf-8")
+        self._log.write(text)
+        self._log.flush()
+
+    def load(self) -> int:
+        """
+        Claim a log slot, then replay the votes a previous process left in it
+        and in any slot no running worker holds.
+        Their table state is unknown, so they add nothing to pending deltas.
+        """
+        if self.durability == "memory" or self._slot_lock is not None:
+            return 0
+        for slot in range(MAX_LOG_SLOTS):
+            path = slot_log_path(self.base_log_path, slot)
+            self._slot_lock = try_lock(f"{path}.lock")
+            if self._slot_lock is not None:
+                break
+        else:
+            raise RuntimeError(
+                f"All {MAX_LOG_SLOTS} vote buffer log slots are held by other processes"
+            )
+        self.log_path = path
+        self.flushing_path = f"{path}.flushing"
+
+        lines = read_log_lines(path)
+        if lines and not lines[-1].endswith("\n"):
+            # Keep the next vote off the torn line a crash mid-write left
+            self._write_log("\n")
+        loaded = self._replay(lines)
+
+        # Adopt the logs of slots nobody holds, e.g. after running fewer workers
+        for slot in range(MAX_LOG_SLOTS):
+            path = slot_log_path(self.base_log_path, slot)
+            if path == self.log_path or not os.path.exists(f"{path}.lock"):
+                continue
+            lock = try_lock(f"{path}.lock")
+            if lock is None:
+                continue
+            try:
+                lines = [line for line in read_log_lines(path) if line.endswith("\n")]
+                if lines:
+                    # Into our own log first, so the votes stay on disk
+                    self._write_log("".join(lines))
+                    if self.durability == "fsync":
+                        os.fsync(self._log.fileno())
+                    loaded += self._replay(lines)
+                for orphan in (f"{path}.flushing", path):
+                    with suppress(FileNotFoundError):
+                        os.remove(orphan)
+            finally:
+                lock.close()
+        return loaded
+
+    def _replay(self, lines: list[str]) -> int:
+        replayed = 0
+        for line in lines:
+            try:
+                entry = json.loads(line)
+                key = (int(entry["user_id"]), int(entry["post_id"]))
+                voted = bool(entry["voted"])
+            except (ValueError, KeyError, TypeError):
+                # A torn last line from a crash mid-write
+                continue
+            self._set(key, voted, None)
+            replayed += 1
+        return replayed
+
+    # -------------------- FLUSH --------------------
+
+    async def flush(self) -> int:
+        """
+        Write every pending vote in batches and return how many were written.
+        Only one flush may run at a time.
+        """
+        async with self._lock:
+            if self._flush_running:
+                raise RuntimeError("A vote buffer flush is already running")
+            if not self.pending:
+                return 0
+            self._flush_running = True
+            self.flushing, self.pending = self.pending, {}
+            self.flushing_deltas, self.pending_deltas = self.pending_deltas, Counter()
+            self._rotate_log()
+            self.full.clear()
+
+        try:
+            try:
+                counts = await write_votes(
+                    {key: voted for key, (voted, _) in self.flushing.items()}
+                )
+            except BaseException as exc:
+                # Cancellation too: a shutdown mid-write must leave the votes
+                # for the final flush. Writing them twice is harmless, as the
+                # counts come from what RETURNING reports.
+                if isinstance(exc, Exception):
+                    self.failures += 1
+                self._restore()
+                raise
+
+            flushed, self.flushing = self.flushing, {}
+            self.flushing_deltas = Counter()
+            self.flushed += len(flushed)
+            if self.durability != "memory":
+                with suppress(FileNotFoundError):
+                    os.remove(self.flushing_path)
+        finally:
+            self._flush_running = False
+
+        if counts:
+            await feed_cache.invalidate()
+        return len(flushed)
+
+    def _rotate_log(self):
+        # Flushing votes move to their own file, deleted once they commit.
+        # A file left by a failed flush is extended, not replaced.
+        if self.durability == "memory":
+            return
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+        if not os.path.exists(self.log_path):
+            return
+        if not os.path.exists(self.flushing_path):
+            os.replace(self.log_path, self.flushing_path)
+            return
+        with open(self.log_path, encoding="utf-8") as log:
+            lines = log.read()
+        with open(self.flushing_path, "a", encoding="utf-8") as flushing:
+            flushing.write(lines)
+            flushing.flush()
+            if self.durability == "fsync":
+                os.fsync(flushing.fileno())
+        os.remove(self.log_path)
+
+    def _restore(self):
+        # Newer votes win, but keep the older stored state they were based on
+        for key, (voted, stored) in self.flushing.items():
+            newer = self.pending.get(key)
+            self.pending[key] = (voted, stored) if newer is None else (newer[0], stored)
+        self.flushing = {}
+        self.flushing_deltas = Counter()
+        self.pending_deltas = Counter()
+        for key, entry in self.pending.items():
+            self.pending_deltas[key[1]] += contribution(entry)
+
+
+def slot_log_path(base_path: str, slot: int) -> str:
+    return base_path if slot == 0 else f"{base_path}.{slot}"
+
+
+def try_lock(path: str):
+    """
+    Open path and take an exclusive flock on it without waiting. Returns the
+    open file, which holds the lock until closed, or None if it is taken.
+    """
+    # POSIX only, and only needed by the log durability modes
+    import fcntl
+
+    lock = open(path, "a")
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock.close()
+        return None
+    return lock
+
+
+def read_log_lines(path: str) -> list[str]:
+    # Votes of a flush that never committed come before the newer log
+    lines = []
+    for log_path in (f"{path}.flushing", path):
+        if os.path.exists(log_path):
+            with open(log_path, encoding="utf-8") as log:
+                lines += log.readlines()
+    return lines
+
+
+def contribution(entry: tuple[bool, bool | None]) -> int:
+    voted, stored = entry
+    if stored is None:
+        return 0
+    return int(voted) - int(stored)
+
+
+async def write_votes(votes: dict[tuple[int, int], bool]) -> Counter[int]:
+    """
+    Apply buffered votes in one transaction: batched INSERT ... ON CONFLICT DO
+    NOTHING and DELETE statements, then a single vote_count update per post.
+    Returns the vote_count change per post, from what RETURNING reported.
+    """
+    items = list(votes.items())
+    counts: Counter[int] = Counter()
+    async with AsyncSessionLocal() as session:
+        for start in range(0, len(items), settings.vote_flush_batch_size):
+            batch = items[start : start + settings.vote_flush_batch_size]
+            to_add = [key for key, voted in batch if voted]
+            to_remove = [key for key, voted in batch if not voted]
+
+            if to_add:
+                # Users and posts deleted since the vote was buffered would
+                # fail the foreign keys and the whole flush with them
+                post_ids = {post_id for _, post_id in to_add}
+                user_ids = {user_id for user_id, _ in to_add}
+                live_posts = set(
+                    await session.scalars(
+                        select(models.Post.id).where(models.Post.id.in_(post_ids))
+                    )
+                )
+                live_users = set(
+                    await session.scalars(
+                        select(models.User.id).where(models.User.id.in_(user_ids))
+                    )
+                )
+                rows = [
+                    {"user_id": user_id, "post_id": post_id}
+                    for user_id, post_id in to_add
+                    if user_id in live_users and post_id in live_posts
+                ]
+                if rows:
+                    result = await session.execute(
+                        dialect_insert(models.Vote)
+                        .values(rows)
+                        .on_conflict_do_nothing()
+                        .returning(models.Vote.post_id)
+                    )
+                    counts.update(result.scalars().all())
+
+            if to_remove:
+                result = await session.execute(
+                    delete(models.Vote)
+                    .where(
+                        tuple_(models.Vote.user_id, models.Vote.post_id).in_(to_remove)
+                    )
+                    .returning(models.Vote.post_id)
+                )
+                counts.subtract(result.scalars().all())
+
+        voted_at = models.utcnow()
+        changed = [
+            {"post_id": post_id, "delta": delta, "voted_at": voted_at}
+            for post_id, delta in counts.items()
+            if delta
+        ]
+        if changed:
+            await session.execute(update_vote_count, changed)
+        await session.commit()
+    return Counter({post_id: delta for post_id, delta in counts.items() if delta})
+
+
+vote_buffer = VoteBuffer(settings.vote_buffer_durability, settings.vote_buffer_log_path)
+
+
+async def run_vote_flusher():
+    """
+    Background task: flush buffered votes every interval, or sooner once the
+    buffer is full, until cancelled.
+    """
+    try:
+        while True:
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(
+                    vote_buffer.full.wait(), settings.vote_flush_interval_seconds
+                )
+            try:
+                await vote_buffer.flush()
+            except Exception:
+                logger.exception("Vote buffer flush failed")
+    finally:
+        # Don't drop acknowledged votes on shutdown
+        await asyncio.shield(vote_buffer.flush())
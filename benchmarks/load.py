@@ -0,0 +1,407 @@
+"""
+Seed a synthetic dataset and load-test the API.
+
+The target database is whatever the app settings point at (DATABASE_COM=sqlite
+or a local Postgres) and must already be migrated.
+
+    uv run python -m benchmarks.load seed --users 1000 --posts 20000 --votes 100000
+    uv run python -m benchmarks.load run --mode asgi --requests 500 --concurrency 20
+    uv run python -m benchmarks.load run --mode uvicorn --workers 4 --output bench.json
+
+asgi drives the app in-process through httpx.ASGITransport; uvicorn starts a
+multi-worker server and drives it over HTTP. Results are printed (or written
+with --output) as JSON with throughput and p50/p95/p99 latency per scenario.
+Set FEED_CACHE_ENABLED=true to measure the feed cache instead of
+get_posts_query (with FEED_CACHE_BACKEND=redis when using several workers).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import httpx
+from sqlalchemy import delete, func, insert, select, text
+
+from app.config.config import settings
+from app.database.database import AsyncSessionLocal, engine
+from app.models import models
+from app.ranking import ranking
+from app.utils import utils
+
+PASSWORD = "Bench-passw0rd"
+EMAIL_TEMPLATE = "bench{}@example.com"
+WORDS = (
+    "fastapi python async database index query cache vote feed search "
+    "postgres sqlite latency throughput worker cursor token session"
+).split()
+SEED_CHUNK_SIZE = 1000
+
+
+# -------------------- SEED --------------------
+
+
+def random_text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+async def insert_chunked(session, model, rows: list[dict]):
+    for start in range(0, len(rows), SEED_CHUNK_SIZE):
+        await session.execute(insert(model), rows[start : start + SEED_CHUNK_SIZE])
+
+
+async def seed(users: int, posts: int, votes: int, seed_value: int):
+    """
+    Replace all users, posts and votes with a synthetic dataset.
+    """
+    rng = random.Random(seed_value)
+    # One Argon2 hash shared by every account keeps seeding fast
+    password_hash = utils.hash(PASSWORD)
+    now = datetime.now(timezone.utc)
+
+    async with AsyncSessionLocal() as session:
+        for model in (models.Vote, models.Post, models.User):
+            await session.execute(delete(model))
+
+        await insert_chunked(
+            session,
+            models.User,
+            [
+                {
+                    "email": EMAIL_TEMPLATE.format(i),
+                    "first_name": f"Bench{i}",
+                    "last_name": "User",
+                    "password": password_hash,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for i in range(users)
+            ],
+        )
+        user_ids = (await session.scalars(select(models.User.id))).all()
+
+        post_rows = []
+        for _ in range(posts):
+            created_at = now - timedelta(seconds=rng.randint(0, 30 * 24 * 3600))
+            post_rows.append(
+                {
+                    "title": random_text(rng, 6),
+                    "content": random_text(rng, 40),
+                    "published": rng.random() < 0.9,
+                    "owner_id": rng.choice(user_ids),
+                    "created_at": created_at,
+                    "updated_at": created_at,
+                }
+            )
+        await insert_chunked(session, models.Post, post_rows)
+        post_ids = (await session.scalars(select(models.Post.id))).all()
+
+        pairs = set()
+        target = min(votes, len(user_ids) * len(post_ids))
+        while len(pairs) < target:
+            pairs.add((rng.choice(user_ids), rng.choice(post_ids)))
+        await insert_chunked(
+            session,
+            models.Vote,
+            [{"user_id": user_id, "post_id": post_id} for user_id, post_id in pairs],
+        )
+
+        # Same backfill as the vote_count migration
+        await session.execute(
+            text(
+                "UPDATE posts SET vote_count = "
+                "(SELECT COUNT(*) FROM votes WHERE votes.post_id = posts.id)"
+            )
+        )
+        await session.commit()
+
+    # Scores were computed at insert time, before the vote_count backfill
+    await ranking.refresh_hot_scores(post_ids)
+    await engine.dispose()
+    print(
+        json.dumps(
+            {"users": len(user_ids), "posts": len(post_ids), "votes": len(pairs)}
+        )
+    )
+
+
+# -------------------- SCENARIOS --------------------
+
+
+async def dataset_ids() -> tuple[int, list[int]]:
+    async with AsyncSessionLocal() as session:
+        users = await session.scalar(
+            select(func.count()).where(
+                models.User.email.like(EMAIL_TEMPLATE.format("%"))
+            )
+        )
+        post_ids = (
+            await session.scalars(
+                select(models.Post.id).where(models.Post.published.is_(True))
+            )
+        ).all()
+    await engine.dispose()
+    if not users or not post_ids:
+        sys.exit("No benchmark dataset found, run the seed command first")
+    return users, list(post_ids)
+
+
+async def login(client: httpx.AsyncClient, index: int) -> httpx.Response:
+    return await client.post(
+        "/login",
+        data={"username": EMAIL_TEMPLATE.format(index), "password": PASSWORD},
+    )
+
+
+def build_scenarios(tokens: list[dict], post_ids: list[int], rng: random.Random):
+    """
+    Map scenario names to callables issuing one request each.
+    """
+    # Adds and removals alternate per (user, post) pair, so the vote table
+    # stays near its seeded size; 409/404s from seeded votes or concurrent
+    # requests on the same pair show up in status_counts
+    vote_pairs = [
+        (headers, post_id, direction)
+        for headers in tokens
+        for post_id in rng.sample(post_ids, min(len(post_ids), 25))
+        for direction in (1, 0)
+    ]
+
+    def feed(params: str):
+        return lambda client, i: client.get(
+            f"/posts?{params}", headers=tokens[i % len(tokens)]
+        )
+
+    def vote(client, i):
+        headers, post_id, direction = vote_pairs[i % len(vote_pairs)]
+        return client.post(
+            "/vote", json={"post_id": post_id, "dir": direction}, headers=headers
+        )
+
+    return {
+        "posts_newest": feed("sort=newest"),
+        "posts_oldest": feed("sort=oldest"),
+        "posts_popularity": feed("sort=popularity"),
+        "posts_hot": feed("sort=hot"),
+        "posts_search": feed("search=" + " ".join(rng.sample(WORDS, 2))),
+        "post_by_id": lambda client, i: client.get(
+            f"/posts/{post_ids[i % len(post_ids)]}", headers=tokens[i % len(tokens)]
+        ),
+        "vote": vote,
+    }
+
+
+def summarize(latencies: list[float], statuses: list[int], elapsed: float) -> dict:
+    latencies_ms = sorted(latency * 1000 for latency in latencies)
+    cut_points = statistics.quantiles(latencies_ms, n=100, method="inclusive")
+    status_counts: dict[str, int] = {}
+    for code in statuses:
+        status_counts[str(code)] = status_counts.get(str(code), 0) + 1
+    return {
+        "requests": len(latencies_ms),
+        "errors": sum(1 for code in statuses if code >= 500),
+        "status_counts": status_counts,
+        "duration_s": round(elapsed, 4),
+        "throughput_rps": round(len(latencies_ms) / elapsed, 2),
+        "mean_ms": round(statistics.fmean(latencies_ms), 3),
+        "p50_ms": round(cut_points[49], 3),
+        "p95_ms": round(cut_points[94], 3),
+        "p99_ms": round(cut_points[98], 3),
+    }
+
+
+async def run_scenario(client, request, requests: int, concurrency: int) -> dict:
+    """
+    Issue requests through concurrency workers and summarize their latencies.
+    """
+    latencies: list[float] = []
+    statuses: list[int] = []
+    counter = iter(range(requests))
+
+    async def worker():
+        for i in counter:
+            start = time.perf_counter()
+            response = await request(client, i)
+            latencies.append(time.perf_counter() - start)
+            statuses.append(response.status_code)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, statuses, time.perf_counter() - start)
+
+
+async def drive(client: httpx.AsyncClient, args, users: int, post_ids: list[int]):
+    rng = random.Random(args.seed)
+    results = {}
+
+    # Logins are Argon2-bound, so they get their own (smaller) request count
+    login_indexes = [rng.randrange(users) for _ in range(args.login_requests)]
+    results["login"] = await run_scenario(
+        client,
+        lambda client, i: login(client, login_indexes[i]),
+        args.login_requests,
+        args.concurrency,
+    )
+
+    tokens = []
+    for index in rng.sample(range(users), min(users, args.sessions)):
+        response = await login(client, index)
+        response.raise_for_status()
+        tokens.append({"Authorization": f"Bearer {response.json()['access_token']}"})
+
+    scenarios = build_scenarios(tokens, post_ids, rng)
+    for name in args.scenarios or scenarios:
+        # Warm caches and connections so the first requests don't skew p99
+        for i in range(min(args.warmup, args.requests)):
+            await scenarios[name](client, i)
+        results[name] = await run_scenario(
+            client, scenarios[name], args.requests, args.concurrency
+        )
+    return results
+
+
+# -------------------- RUNNERS --------------------
+
+
+async def run_asgi(args, users: int, post_ids: list[int]) -> dict:
+    from app.app import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+        return await drive(c, args, users, post_ids)
+
+
+async def wait_until_ready(client: httpx.AsyncClient, server, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with code {server.returncode}")
+        try:
+            await client.get("/openapi.json")
+            return
+        except httpx.TransportError:
+            await asyncio.sleep(0.2)
+    raise RuntimeError("uvicorn did not start in time")
+
+
+async def run_uvicorn(args, users: int, post_ids: list[int]) -> dict:
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.app:app",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(args.port),
+            "--workers",
+            str(args.workers),
+            "--log-level",
+            "warning",
+        ],
+        env=os.environ.copy(),
+    )
+    try:
+        limits = httpx.Limits(max_connections=args.concurrency)
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{args.port}", limits=limits, timeout=60
+        ) as client:
+            await wait_until_ready(client, server)
+            return await drive(client, args, users, post_ids)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args):
+    users, post_ids = await dataset_ids()
+    runner = run_asgi if args.mode == "asgi" else run_uvicorn
+    started_at = datetime.now(timezone.utc).isoformat()
+    results = await runner(args, users, post_ids)
+
+    report = {
+        "meta": {
+            "commit": git_revision(),
+            "started_at": started_at,
+            "mode": args.mode,
+            "workers": args.workers if args.mode == "uvicorn" else 1,
+            "database": settings.database_com,
+            "feed_cache_enabled": settings.feed_cache_enabled,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "published_posts": len(post_ids),
+        },
+        "scenarios": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed_parser = commands.add_parser("seed", help="replace data with a dataset")
+    seed_parser.add_argument("--users", type=int, default=1000)
+    seed_parser.add_argument("--posts", type=int, default=20000)
+    seed_parser.add_argument("--votes", type=int, default=100000)
+    seed_parser.add_argument("--seed", type=int, default=0)
+
+    run_parser = commands.add_parser("run", help="drive the API and report")
+    run_parser.add_argument("--mode", choices=["asgi", "uvicorn"], default="asgi")
+    run_parser.add_argument("--workers", type=int, default=4)
+    run_parser.add_argument("--port", type=int, default=8765)
+    run_parser.add_argument("--requests", type=int, default=500)
+    run_parser.add_argument("--login-requests", type=int, default=50)
+    run_parser.add_argument("--concurrency", type=int, default=20)
+    run_parser.add_argument("--sessions", type=int, default=50)
+    run_parser.add_argument("--warmup", type=int, default=20)
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument(
+        "--scenario",
+        dest="scenarios",
+        action="append",
+        choices=[
+            "posts_newest",
+            "posts_oldest",
+            "posts_popularity",
+            "posts_hot",
+            "posts_search",
+            "post_by_id",
+            "vote",
+        ],
+    )
+    run_parser.add_argument("--output")
+    args = parser.parse_args()
+
+    if args.command == "seed":
+        asyncio.run(seed(args.users, args.posts, args.votes, args.seed))
+    else:
+        asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Compare the default feed serialization with the fast path.
+
+default: ORM Post rows wrapped in dicts, validated against
+         List[schemas.PostVoted] (from_attributes) and dumped to JSON, which is
+         what FastAPI does with response_model.
+fast:    plain row tuples shaped with format_plain_post_row and encoded
+         directly with pydantic-core (settings.fast_serialization).
+
+    uv run python -m benchmarks.serialization --rows 50 --repeat 2000
+"""
+
+import argparse
+import json
+import timeit
+from collections import namedtuple
+from datetime import datetime, timezone
+from typing import List
+
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+
+import app.models.models as models
+import app.schemas.schemas as schemas
+from app.routers.post import PLAIN_POST_COLUMNS, format_plain_post_row
+
+
+def build_orm_rows(count: int) -> list[dict]:
+    owner = models.User(
+        id=1, first_name="Ada", last_name="Lovelace", email="ada@example.com"
+    )
+    created_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return [
+        {
+            "Post": models.Post(
+                id=i,
+                title=f"Post {i}",
+                content="lorem ipsum " * 20,
+                published=True,
+                created_at=created_at,
+                owner_id=owner.id,
+                owner=owner,
+            ),
+            "votes": i % 7,
+            "user_voted": i % 2 == 0,
+        }
+        for i in range(count)
+    ]
+
+
+PlainRow = namedtuple(
+    "PlainRow",
+    [column.key for column in PLAIN_POST_COLUMNS] + ["votes", "user_voted"],
+)
+
+
+def build_plain_rows(orm_rows: list[dict]) -> list[PlainRow]:
+    """
+    The same data as the rows a plain_rows=True feed query returns.
+    """
+    return [
+        PlainRow(
+            id=row["Post"].id,
+            title=row["Post"].title,
+            content=row["Post"].content,
+            published=row["Post"].published,
+            created_at=row["Post"].created_at,
+            updated_at=row["Post"].created_at,
+            owner_id=row["Post"].owner_id,
+            hot_score=0.0,
+            owner_first_name=row["Post"].owner.first_name,
+            owner_last_name=row["Post"].owner.last_name,
+            owner_email=row["Post"].owner.email,
+            owner_updated_at=row["Post"].created_at,
+            votes=row["votes"],
+            user_voted=row["user_voted"],
+        )
+        for row in orm_rows
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--rows", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    adapter = TypeAdapter(List[schemas.PostVoted])
+    orm_rows = build_orm_rows(args.rows)
+    plain_rows = build_plain_rows(orm_rows)
+
+    def default():
+        return adapter.dump_json(
+            adapter.validate_python(orm_rows, from_attributes=True)
+        )
+
+    def fast():
+        return to_json([format_plain_post_row(row) for row in plain_rows])
+
+    assert default() == fast(), "fast path output differs from response_model"
+
+    results = {}
+    for name, func in (("default", default), ("fast", fast)):
+        seconds = min(timeit.repeat(func, number=args.repeat, repeat=5))
+        results[name] = {"us_per_response": seconds / args.repeat * 1e6}
+    results["speedup"] = (
+        results["default"]["us_per_response"] / results["fast"]["us_per_response"]
+    )
+    print(json.dumps({"rows": args.rows, **results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Compare per-request JWT decoding with the decoded-token cache.
+
+Simulates active sessions that each reuse one token for many requests,
+interleaved the way a worker sees them, and times verify_access_token
+with the cache disabled (decode on every call) and enabled.
+
+    uv run python -m benchmarks.token_cache --sessions 200 --requests 300
+"""
+
+import argparse
+import random
+import time
+
+from fastapi import HTTPException
+
+from app.auth import oauth2
+
+
+def build_request_stream(sessions: int, requests: int, seed: int) -> list[str]:
+    tokens = [
+        oauth2.create_access_token(
+            {"sub": str(i), "user_email": f"user{i}@example.com", "ver": 0}
+        )
+        for i in range(sessions)
+    ]
+    stream = [token for token in tokens for _ in range(requests)]
+    random.Random(seed).shuffle(stream)
+    return stream
+
+
+def run(stream: list[str], maxsize: int) -> tuple[float, dict]:
+    credentials_exception = HTTPException(status_code=401)
+    oauth2.token_cache.clear()
+    oauth2.token_cache.hits = oauth2.token_cache.misses = 0
+    oauth2.token_cache.maxsize = maxsize
+
+    start = time.perf_counter()
+    for token in stream:
+        oauth2.verify_access_token(token, credentials_exception)
+    elapsed = time.perf_counter() - start
+    return elapsed, oauth2.token_cache.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--cache-size", type=int, default=4096)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    stream = build_request_stream(args.sessions, args.requests, args.seed)
+    for label, maxsize in [("decode", 0), ("cached", args.cache_size)]:
+        elapsed, stats = run(stream, maxsize)
+        per_call_us = elapsed / len(stream) * 1e6
+        print(
+            f"{label:>7}: {len(stream)} calls in {elapsed:.3f}s "
+            f"({per_call_us:.1f} us/call), hits={stats['hits']} "
+            f"misses={stats['misses']} hit_rate={stats['hit_rate']:.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+EXPLAIN every feed query shape the routers issue and fail on sequential scans.
+
+With DATABASE_COM=sqlite the checks run on a fresh database migrated into a
+temporary directory. Against PostgreSQL they use the configured database,
+which must be migrated, with enable_seqscan off: a sequential scan in the plan
+then means no index can serve the query at all, whatever the table size.
+"""
+
+import asyncio
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+import app.models.models as models
+from app.config.config import settings
+from app.database.database import DATABASE_URL, connect_args
+from app.routers.post import (
+    encode_cursor,
+    get_posts_query,
+    unpublished_posts_query,
+    user_voted_ids_query,
+)
+from app.ranking.ranking import voted_posts_query
+from app.timeline.timeline import home_post_ids_query
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+USER_ID = 1
+PAGE_SIZE = 50
+CURSOR_TIME = datetime(2026, 1, 1, tzinfo=timezone.utc)
+CURSOR_VALUES = {
+    "newest": CURSOR_TIME,
+    "oldest": CURSOR_TIME,
+    "popularity": 10,
+    "hot": 1250.5,
+}
+
+# Tables that must never be read with a full scan by a feed query
+CHECKED_TABLES = ("posts", "users", "votes", "follows", "timeline_entries")
+
+
+def feed_statements():
+    """
+    Yield (name, statement) for every feed query shape the routers issue.
+    """
+    for plain_rows in (False, True):
+        rows = "plain" if plain_rows else "orm"
+        for owner_only in (False, True):
+            route = "/posts/me" if owner_only else "/posts"
+            for sort, value in CURSOR_VALUES.items():
+                for cursor in (None, encode_cursor(sort, value, 1000)):
+                    stmt = get_posts_query(
+                        USER_ID,
+                        owner_only=owner_only,
+                        sort=sort,
+                        cursor=cursor,
+                        plain_rows=plain_rows,
+                    )
+                    name = f"{route} {rows} sort={sort}" + (" cursor" if cursor else "")
+                    yield name, stmt.limit(PAGE_SIZE)
+
+        for sort in ("relevance", "newest"):
+            stmt = get_posts_query(
+                USER_ID, "hello world", sort=sort, plain_rows=plain_rows
+            )
+            yield f"/posts {rows} search sort={sort}", stmt.limit(PAGE_SIZE)
+
+        # /posts/home hydrates the ids picked by the timeline query
+        stmt = get_posts_query(USER_ID, sort="newest", plain_rows=plain_rows)
+        yield (
+            f"/posts/home {rows} hydrate",
+            stmt.where(models.Post.id.in_(range(PAGE_SIZE))),
+        )
+
+    # The shared public page behind the feed cache and single-flight
+    for sort, value in CURSOR_VALUES.items():
+        for cursor in (None, encode_cursor(sort, value, 1000)):
+            stmt = get_posts_query(None, sort=sort, cursor=cursor, plain_rows=True)
+            name = f"/posts shared sort={sort}" + (" cursor" if cursor else "")
+            yield name, stmt.limit(PAGE_SIZE)
+    stmt = get_posts_query(None, "hello world", sort="relevance", plain_rows=True)
+    yield "/posts shared search", stmt.limit(PAGE_SIZE)
+    yield "/posts shared drafts check", unpublished_posts_query(USER_ID)
+    yield "/posts shared vote overlay", user_voted_ids_query(USER_ID, [1, 2, 3])
+
+    yield "/posts/{id}", get_posts_query(USER_ID).where(models.Post.id == 1)
+
+    yield "/posts/home", home_post_ids_query(USER_ID, PAGE_SIZE)
+    yield (
+        "/posts/home cursor",
+        home_post_ids_query(USER_ID, PAGE_SIZE, (CURSOR_TIME, 1000)),
+    )
+
+    # Not a feed query, but it runs every few seconds on every worker
+    yield "hot score refresh", voted_posts_query(CURSOR_TIME)
+
+
+FEED_STATEMENTS = list(feed_statements())
+
+
+def sqlite_seq_scans(plan_rows) -> list[str]:
+    # "SCAN posts" is a full scan; "SCAN posts USING INDEX ..." walks an index
+    scans = []
+    for row in plan_rows:
+        words = row[-1].split()
+        if (
+            len(words) >= 2
+            and words[0] == "SCAN"
+            and words[1] in CHECKED_TABLES
+            and "USING" not in words
+        ):
+            scans.append(row[-1])
+    return scans
+
+
+def postgres_seq_scans(node) -> list[str]:
+    scans = []
+    if node.get("Node Type") == "Seq Scan" and node.get("Relation Name") in (
+        CHECKED_TABLES
+    ):
+        scans.append(f"Seq Scan on {node['Relation Name']}")
+    for child in node.get("Plans", []):
+        scans.extend(postgres_seq_scans(child))
+    return scans
+
+
+def main_head(script: ScriptDirectory) -> str:
+    # A stray root revision sits beside the real history; only the head
+    # descending from another revision builds the schema
+    return next(
+        revision.revision
+        for revision in map(script.get_revision, script.get_heads())
+        if revision.down_revision is not None
+    )
+
+
+@pytest.fixture(scope="module")
+def database_url(tmp_path_factory):
+    if settings.database_com != "sqlite":
+        return DATABASE_URL
+
+    # Migrations and the app both use ./sql_app.db; run them in a scratch dir
+    workdir = tmp_path_factory.mktemp("query_plans")
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.chdir(workdir)
+        config = Config(str(REPO_ROOT / "alembic.ini"))
+        command.upgrade(config, main_head(ScriptDirectory.from_config(config)))
+    return f"sqlite+aiosqlite:///{workdir / 'sql_app.db'}"
+
+
+async def explain(database_url: str, stmt) -> list[str]:
+    engine = create_async_engine(
+        database_url, poolclass=NullPool, connect_args=connect_args
+    )
+    compiled = stmt.compile(
+        dialect=engine.dialect, compile_kwargs={"literal_binds": True}
+    )
+    try:
+        async with engine.connect() as conn:
+            if engine.dialect.name == "sqlite":
+                result = await conn.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))
+                return sqlite_seq_scans(result.all())
+
+            await conn.execute(text("SET enable_seqscan = off"))
+            result = await conn.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}"))
+            plan = result.scalar_one()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return postgres_seq_scans(plan[0]["Plan"])
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.parametrize(
+    "stmt", [stmt for _, stmt in FEED_STATEMENTS], ids=[n for n, _ in FEED_STATEMENTS]
+)
+def test_feed_query_uses_indexes(database_url, stmt):
+    assert asyncio.run(explain(database_url, stmt)) == []